@@ -0,0 +1,250 @@
+"""注文の検証結果をディスクにキャッシュする（オプトイン）
+
+同じ過去ウィンドウを何度も検証する回帰実行で、変化のない注文の再検証を省くためのもの。
+キーは注文JSONのダイジェスト、値は再計算したhashとフォーマット検証の結果。
+hashルールや検証ルールが変わった場合はキャッシュ全体を捨てる
+"""
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from mos_test.hash_rules import HASH_RULE_VERSION, compute_order_hash_v1
+from mos_test.models import Order
+from mos_test import validators
+from mos_test.validators import check_conditions_json, validate_order
+
+DEFAULT_MAX_ENTRIES = 1_000_000     #キャッシュに保持する最大件数
+
+
+def rules_fingerprint() -> str:
+    """hashルール/検証ルールの指紋。変わればキャッシュの内容は無効
+
+    :return: 16進文字列
+    :rtype: str
+    """
+    rules = {
+        "hash": HASH_RULE_VERSION,
+        "validators": validators.RULES_VERSION,
+        "patterns": [
+            validators.RE_STORE.pattern,
+            validators.RE_CUSTOMER.pattern,
+            validators.RE_HASH.pattern,
+            validators.RE_TIME.pattern,
+            validators.RE_MENUID.pattern,
+        ],
+        "status": sorted(validators.ALLOWED_STATUS_SINGLE),
+        "schema": Order.model_json_schema(),
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def order_key(order: Any) -> bytes:
+    """注文JSONのダイジェスト（キャッシュのキー）
+
+    json.dumps(sort_keys=True) より速い repr() から作る。repr は型も区別する（1 と "1" は別のキー）。
+    キーの順序が変わると別のキーになるが、キャッシュに当たらなくなるだけで結果は変わらない
+
+    :param order: 注文1件のJSON
+    :type order: Any
+    :return: 16バイトのダイジェスト
+    :rtype: bytes
+    """
+    return hashlib.blake2b(repr(order).encode("utf-8"), digest_size=16).digest()
+
+
+class VerifiedCache:
+    """SQLite に検証結果を保存する LRU キャッシュ
+
+    複数スレッド（--targets）から使えるよう、接続はロックで保護する
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """キャッシュファイルを開き、ルールが変わっていれば中身を捨てる
+
+        :param self: キャッシュ
+        :param path: キャッシュファイルのパス
+        :type path: str
+        :param max_entries: 保持する最大件数（超えたら最終利用が古いものから消す）
+        :type max_entries: int
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._tick = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS verified ("
+            " key BLOB PRIMARY KEY, hash TEXT, ok INTEGER, error TEXT, last_used INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS verified_lru ON verified (last_used)")
+
+        #ルールが変わっていれば全件無効
+        fingerprint = rules_fingerprint()
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        if row is None or row[0] != fingerprint:
+            self._db.execute("DELETE FROM verified")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (fingerprint,))
+
+        #LRU の時刻は単調増加のカウンタで持つ
+        self._tick = self._db.execute("SELECT COALESCE(MAX(last_used), 0) FROM verified").fetchone()[0]
+        self._db.commit()
+
+    def __enter__(self) -> "VerifiedCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """キャッシュファイルを閉じる
+
+        :param self: キャッシュ
+        """
+        self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM verified").fetchone()[0]
+
+    def verify(self, orders: List[Any]) -> List[Tuple[str, Optional[str]]]:
+        """注文ごとに (再計算hash, フォーマット不正の理由) を返す。未キャッシュの注文だけ検証する
+
+        :param self: キャッシュ
+        :param orders: 注文JSONの配列
+        :type orders: List[Any]
+        :return: 入力と同じ順序の (hash, error)。error が None なら正しい
+        :rtype: List[Tuple[str, Optional[str]]]
+        """
+        keys = [order_key(o) for o in orders]
+
+        with self._lock:
+            cached: Dict[bytes, Tuple[str, Optional[str]]] = {}
+            #SQLite の変数上限を超えないよう分割して引く
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT key, hash, ok, error FROM verified WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for k, h, ok, error in rows:
+                    cached[k] = (h, None if ok else error)
+
+        hits = misses = 0
+        results: List[Tuple[str, Optional[str]]] = []
+        fresh: Dict[bytes, Tuple[str, Optional[str]]] = {}
+        for k, o in zip(keys, orders):
+            hit = cached.get(k) or fresh.get(k)
+            if hit is not None:
+                hits += 1
+                results.append(hit)
+                continue
+
+            misses += 1
+            try:
+                validate_order(o)
+                error = None
+            except Exception as e:
+                error = str(e).splitlines()[0]
+            entry = (compute_order_hash_v1(o) if isinstance(o, dict) else "", error)
+            fresh[k] = entry
+            results.append(entry)
+
+        self._store(fresh, list(cached), hits, misses)
+        return results
+
+    def _store(
+        self,
+        fresh: Dict[bytes, Tuple[str, Optional[str]]],
+        used: List[bytes],
+        hits: int,
+        misses: int,
+    ) -> None:
+        """新しい結果を書き込み、ヒットしたキーの最終利用をまとめて更新し、上限を超えた分を消す
+
+        最終利用の更新はキー1件ずつではなく、500件ずつの IN 句でまとめて行う
+        """
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self._tick += 1
+            self._db.executemany(
+                "INSERT OR REPLACE INTO verified VALUES (?, ?, ?, ?, ?)",
+                [(k, h, int(error is None), error, self._tick) for k, (h, error) in fresh.items()],
+            )
+            for i in range(0, len(used), 500):
+                chunk = used[i:i + 500]
+                self._db.execute(
+                    f"UPDATE verified SET last_used = ? WHERE key IN ({','.join('?' * len(chunk))})",
+                    [self._tick, *chunk],
+                )
+
+            over = self._db.execute("SELECT COUNT(*) FROM verified").fetchone()[0] - self.max_entries
+            if over > 0:
+                self._db.execute(
+                    "DELETE FROM verified WHERE key IN (SELECT key FROM verified ORDER BY last_used LIMIT ?)",
+                    (over,),
+                )
+                self.evicted += over
+            self._db.commit()
+
+
+def validate_orders_cached(
+    obj: Any,
+    cache: VerifiedCache,
+    expected_customer_id: Optional[str] = None,
+    expected_bill_status_mask: Optional[int] = None,
+    from_time: Optional[str] = None,
+    to_time: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """validate_orders_response() とhash再計算を、キャッシュを使って行う
+
+    フォーマット検証とhash再計算の結果だけをキャッシュし、リクエスト条件との整合は毎回検証する
+
+    :param obj: MOSから返ったJSON
+    :type obj: Any
+    :param cache: 検証結果キャッシュ
+    :type cache: VerifiedCache
+    :param expected_customer_id: CLIでcustomerIdを指定した場合に渡す
+    :type expected_customer_id: Optional[str]
+    :param expected_bill_status_mask: --bill-flagを複数指定した場合に渡す
+    :type expected_bill_status_mask: Optional[int]
+    :param from_time: 範囲チェック
+    :type from_time: Optional[str]
+    :param to_time: 範囲チェック
+    :type to_time: Optional[str]
+    :return: hash不一致の注文（find_hash_mismatches() と同じ形）
+    :rtype: List[Dict[str, Any]]
+    """
+
+    #成功時は注文配列（list）という仕様を強制させる
+    if not isinstance(obj, list):
+        raise AssertionError("Expected list response for success (orders array).")
+
+    verdicts = cache.verify(obj)
+    for _, error in verdicts:
+        if error:
+            raise AssertionError(error)
+
+    #フォーマット検証済みなので、条件チェックはモデル化せずに dict のまま行う
+    check_conditions_json(
+        obj,
+        expected_customer_id=expected_customer_id,
+        expected_bill_status_mask=expected_bill_status_mask,
+        from_time=from_time,
+        to_time=to_time,
+    )
+
+    return [
+        {"storeNo": o.get("storeNo"), "customerId": o.get("customerId"), "actual": o.get("hash"), "expected": h}
+        for o, (h, _) in zip(obj, verdicts)
+        if o.get("hash") != h
+    ]
@@ -3,20 +3,100 @@
 
 from __future__ import annotations
 
+import math
 import os
+import statistics
+import time
+from datetime import datetime, timedelta
+import requests
 import typer
 from rich import print
 from rich.console import Console
+from rich.table import Table
 
-from mos_test.client import MosClient
-from mos_test.validators import validate_orders_response, validate_error_response
-from mos_test.hash_rules import compute_order_hash_v1
+from mos_test.cache import DEFAULT_MAX_ENTRIES, VerifiedCache, validate_orders_cached
+from mos_test.client import MosClient, MosResponse
+from mos_test.validators import RE_STORE, RE_TIME, validate_orders_response, validate_error_response
+from mos_test.generator import CUSTOMER_IDS, WorkloadConfig, open_output, parse_bill_mix, write_jsonl
+from mos_test.profiler import DEFAULT_INTERVAL_SEC, SamplingProfiler, idle_sleep
 from mos_test.suites import load_smoke_cases
+from mos_test.watch import WatchIndex, parse_duration
+from mos_test.runner import (
+    DEFAULT_CONFIDENCE,
+    TargetResult,
+    find_hash_mismatches,
+    load_targets,
+    run_case,
+    run_get_orders,
+    run_smoke,
+    run_targets,
+)
 
 #CLI初期化
 app = typer.Typer(add_completion=False)
 console = Console()
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: str | None = typer.Option(
+        None,
+        "--profile",
+        help="Profile the command and write collapsed stacks (flamegraph input) to this file.",
+    ),
+    profile_interval: float = typer.Option(
+        DEFAULT_INTERVAL_SEC * 1000.0,
+        "--profile-interval",
+        min=0.1,
+        help="Sampling interval in ms for --profile.",
+    ),
+):
+    """全コマンド共通のオプション
+
+    :param ctx: Typerのコンテキスト
+    :type ctx: typer.Context
+    :param profile: 指定するとコマンド実行中のスタックを採取し、collapsed 形式で書き出す
+    :type profile: str | None
+    :param profile_interval: サンプリング間隔（ms）
+    :type profile_interval: float
+    """
+    if not profile:
+        return
+
+    profiler = SamplingProfiler(interval_sec=profile_interval / 1000.0)
+    profiler.start()
+
+    def finish() -> None:
+        #コマンド終了時（Exit を含む）に採取を止めて集計を表示する
+        profiler.stop()
+        profiler.write_collapsed(profile)
+        _print_profile(profiler, profile)
+
+    ctx.call_on_close(finish)
+
+
+def _print_profile(profiler: SamplingProfiler, path: str) -> None:
+    """プロファイル結果（MOS側とツール側の内訳）を表示する
+
+    :param profiler: 採取済みのプロファイラ
+    :type profiler: SamplingProfiler
+    :param path: collapsed スタックの出力先
+    :type path: str
+    """
+    #複数スレッド（--targets）の場合、各行はスレッドごとの時間の合計なので wall を超えることがある
+    table = Table(title=f"Profile (wall {profiler.wall_sec * 1000.0:.1f}ms, time summed over threads)")
+    table.add_column("where")
+    table.add_column("ms", justify="right")
+    table.add_column("%", justify="right")
+    for name, ms, pct in profiler.summary():
+        table.add_row(name, f"{ms:.1f}", f"{pct:.1f}")
+    console.print(table)
+    print(
+        f"server+transfer={profiler.server_ms:.1f}ms tool-side={profiler.tool_ms:.1f}ms "
+        f"[dim](collapsed stacks: {path})[/dim]"
+    )
+
+
 def _base_url(base_url: str | None) -> str:
     """実行環境ごとに接続先を切り替えられるよう優先順位で決定する関数
 
@@ -49,6 +129,138 @@ def _mask_from_flags(flags: list[int] | None) -> int | None:
     return mask
 
 
+def _print_transfer(resp: MosResponse) -> None:
+    """転送サイズ（圧縮後/展開後）と応答時間を1行で表示する
+
+    :param resp: MOSからのレスポンス
+    :type resp: MosResponse
+    """
+    print(
+        f"[dim]encoding={resp.content_encoding} wire={resp.wire_bytes}B "
+        f"body={resp.body_bytes}B ratio={resp.compression_ratio:.2f} "
+        f"time={resp.elapsed_ms:.1f}ms (decompress={resp.decompress_ms:.1f}ms)[/dim]"
+    )
+
+
+def _compare_compression(base_url: str, payload, runs: int) -> None:
+    """同じリクエストを圧縮あり/なしで交互に実行し、応答時間と転送サイズを比較表示する
+
+    :param base_url: 接続先
+    :type base_url: str
+    :param payload: リクエスト
+    :param runs: 各モードの実行回数
+    :type runs: int
+    """
+    clients = {
+        "compressed": MosClient(base_url, compress=True),
+        "identity": MosClient(base_url, compress=False),
+    }
+    results: dict[str, list[MosResponse]] = {name: [] for name in clients}
+
+    #キャッシュやサーバ側のウォームアップの影響を偏らせないよう交互に実行する
+    for _ in range(runs):
+        for name, c in clients.items():
+            results[name].append(c.post_orders(payload))
+
+    table = Table(title=f"Compression comparison ({runs} runs each)")
+    table.add_column("mode")
+    table.add_column("encoding")
+    table.add_column("wire bytes", justify="right")
+    table.add_column("body bytes", justify="right")
+    table.add_column("ratio", justify="right")
+    table.add_column("median ms", justify="right")
+    table.add_column("min ms", justify="right")
+    table.add_column("decompress ms", justify="right")
+    for name, rs in results.items():
+        times = [r.elapsed_ms for r in rs]
+        last = rs[-1]
+        table.add_row(
+            name,
+            last.content_encoding,
+            str(last.wire_bytes),
+            str(last.body_bytes),
+            f"{last.compression_ratio:.2f}",
+            f"{statistics.median(times):.1f}",
+            f"{min(times):.1f}",
+            f"{statistics.median(r.decompress_ms for r in rs):.1f}",
+        )
+    console.print(table)
+
+
+def _open_cache(cache_path: str | None, cache_size: int) -> VerifiedCache | None:
+    """--cache 指定時のみ検証結果キャッシュを開く
+
+    :param cache_path: キャッシュファイル
+    :type cache_path: str | None
+    :param cache_size: 保持する最大件数
+    :type cache_size: int
+    :return: キャッシュ（未指定なら None）
+    :rtype: VerifiedCache | None
+    """
+    return VerifiedCache(cache_path, max_entries=cache_size) if cache_path else None
+
+
+def _close_cache(cache: VerifiedCache | None) -> None:
+    """キャッシュの利用状況を表示して閉じる
+
+    :param cache: キャッシュ
+    :type cache: VerifiedCache | None
+    """
+    if cache is None:
+        return
+    print(f"[dim]cache: hits={cache.hits} misses={cache.misses} evicted={cache.evicted}[/dim]")
+    cache.close()
+
+
+def _format_ms(ms: float) -> str:
+    """応答時間を表示用にする（サンプルが無い nan は "-"）
+
+    :param ms: 応答時間
+    :type ms: float
+    :return: 表示用文字列
+    :rtype: str
+    """
+    return "-" if math.isnan(ms) else f"{ms:.1f}"
+
+
+def _print_targets_table(results: list[TargetResult]) -> None:
+    """複数接続先の結果を横並びで比較表示する
+
+    :param results: 接続先ごとの結果
+    :type results: list[TargetResult]
+    """
+    table = Table(title=f"{len(results)} targets")
+    table.add_column("target")
+    table.add_column("pass", justify="right")
+    table.add_column("fail", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("max ms", justify="right")
+    table.add_column("hash mismatch", justify="right")
+    table.add_column("note")
+    for r in results:
+        note = "unreachable" if r.error else ",".join(c.case_id for c in r.cases if not c.ok)
+        table.add_row(
+            r.label,
+            str(r.passed),
+            f"[red]{r.failed}[/red]" if r.failed else "0",
+            _format_ms(r.latency_percentile(50)),
+            _format_ms(r.latency_percentile(95)),
+            _format_ms(r.latency_percentile(100)),
+            f"[red]{r.hash_mismatches}[/red]" if r.hash_mismatches else "0",
+            note,
+        )
+    console.print(table)
+
+    #失敗の詳細は表の下に接続先ごとにまとめて出す（1行目のみ）
+    for r in results:
+        if r.error:
+            print(f"[red]FAIL[/red] {r.label}: {r.error}")
+        for c in r.cases:
+            if not c.ok:
+                print(f"[red]FAIL[/red] {r.label} {c.case_id}: {c.error.splitlines()[0] if c.error else ''}")
+
+
 @app.command()
 def getOrders(
     base_url: str = typer.Option(None, help="MOS base URL (or set MOS_BASE_URL)"),
@@ -60,6 +272,21 @@ def getOrders(
         "--bill-flag",
         help="Billing status flags (bit): 1,2,4,8. Can specify multiple. Omit => null (all).",
     ),
+    no_compress: bool = typer.Option(False, "--no-compress", help="Request identity encoding only."),
+    compare_compression: bool = typer.Option(
+        False,
+        "--compare-compression",
+        help="Compare response time and bytes with and without compression, then exit.",
+    ),
+    compare_runs: int = typer.Option(3, "--compare-runs", min=1, help="Runs per mode for --compare-compression."),
+    targets: str | None = typer.Option(None, "--targets", help="File with one base URL (or 'label URL') per line."),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, help="Max targets processed at once with --targets."),
+    cache_path: str | None = typer.Option(
+        None,
+        "--cache",
+        help="On-disk cache of verified orders; unchanged orders are not re-verified.",
+    ),
+    cache_size: int = typer.Option(DEFAULT_MAX_ENTRIES, "--cache-size", min=1, help="Max orders kept in --cache (LRU)."),
 ):
     """getOrdersを呼び出してスキーマ/条件/ハッシュを検証する
     
@@ -73,10 +300,28 @@ def getOrders(
     :type customer_id: str | None
     :param bill_flag: billStatus
     :type bill_flag: list[int]
+    :param no_compress: 圧縮転送を要求しない
+    :type no_compress: bool
+    :param compare_compression: 圧縮あり/なしの比較のみ行う
+    :type compare_compression: bool
+    :param compare_runs: 比較時の各モードの実行回数
+    :type compare_runs: int
+    :param targets: 接続先一覧ファイル（指定時は全接続先に対して並列実行）
+    :type targets: str | None
+    :param concurrency: 全体の同時実行数
+    :type concurrency: int
+    :param cache_path: 検証結果キャッシュのファイル（未指定ならキャッシュしない）
+    :type cache_path: str | None
+    :param cache_size: キャッシュに保持する最大件数
+    :type cache_size: int
     """
 
+    #比較は単一の接続先に対してのみ行う
+    if targets and compare_compression:
+        raise typer.BadParameter("cannot be combined with --targets", param_hint="--compare-compression")
+
     #接続先URLを確定してHTTPクライアントを作る
-    client = MosClient(_base_url(base_url))
+    client = MosClient(_base_url(base_url), compress=not no_compress)
 
     #複数フラグ → ビットマスク int へ変換
     mask = _mask_from_flags(bill_flag)
@@ -90,37 +335,74 @@ def getOrders(
         "billStatus": mask,          #bitmask か null
     }]
 
+    #複数接続先に対して実行し、結果を比較表示する
+    if targets:
+        cache = _open_cache(cache_path, cache_size)
+        try:
+            results = run_targets(
+                load_targets(targets),
+                lambda c: run_get_orders(
+                    c,
+                    payload,
+                    cache=cache,
+                    expected_customer_id=customer_id,
+                    expected_bill_status_mask=mask,
+                    from_time=from_time,
+                    to_time=to_time,
+                ),
+                concurrency,
+                make_client=lambda url: MosClient(url, compress=not no_compress),
+            )
+        finally:
+            _close_cache(cache)
+        _print_targets_table(results)
+        if any(r.hash_mismatches for r in results):
+            raise typer.Exit(code=2)
+        if any(r.failed for r in results):
+            raise typer.Exit(code=1)
+        return
+
+    #圧縮の効果測定のみ行う場合は検証せずに終了
+    if compare_compression:
+        _compare_compression(_base_url(base_url), payload, compare_runs)
+        return
+
     #POST /api/orders に投げる
     resp = client.post_orders(payload)
     console.rule("[bold]Response[/bold]")
 
     #返却JSONをそのまま表示（トラブル時の調査用）
     print(resp.raw_json)
+    _print_transfer(resp)
 
     #errorCodeがあればエラーとして扱い、エラーレスポンス形式が仕様準拠か検証する
     if resp.is_error:
         validate_error_response(resp.raw_json)
         raise typer.Exit(code=1)
 
-    #注文配列の中身を検証
-    validate_orders_response(
-        resp.raw_json,
-        expected_customer_id=customer_id,
-        expected_bill_status_mask=mask,  #bitmask か None
-        from_time=from_time,
-        to_time=to_time,
-    )
-
-    #hashを再計算し、MOS返却hashと一致するか確認
-    mismatches = []
-    for o in resp.raw_json:
-        expected = compute_order_hash_v1(o)
-        if o.get("hash") != expected:
-            mismatches.append((o.get("hash"), expected, o.get("storeNo"), o.get("customerId")))
+    expected = {
+        "expected_customer_id": customer_id,
+        "expected_bill_status_mask": mask,  #bitmask か None
+        "from_time": from_time,
+        "to_time": to_time,
+    }
+    if cache_path:
+        #キャッシュ済みの注文はフォーマット検証とhash再計算を省く
+        cache = _open_cache(cache_path, cache_size)
+        try:
+            mismatches = validate_orders_cached(resp.raw_json, cache, **expected)
+        finally:
+            _close_cache(cache)
+    else:
+        #注文配列の中身を検証
+        validate_orders_response(resp.raw_json, **expected)
+
+        #hashを再計算し、MOS返却hashと一致するか確認
+        mismatches = find_hash_mismatches(resp.raw_json)
     if mismatches:
         console.rule("[bold red]Hash mismatch[/bold red]")
-        for actual, expected, st, cid in mismatches:
-            print({"storeNo": st, "customerId": cid, "actual": actual, "expected": expected})
+        for m in mismatches:
+            print(m)
         raise typer.Exit(code=2)
 
     console.rule("[bold green]OK[/bold green]")
@@ -170,50 +452,59 @@ def updateStatus(
 @app.command()
 def smoke(
     base_url: str = typer.Option(None, help="MOS base URL (or set MOS_BASE_URL)"),
+    targets: str | None = typer.Option(None, "--targets", help="File with one base URL (or 'label URL') per line."),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, help="Max targets processed at once with --targets."),
+    slo_confidence: float = typer.Option(
+        DEFAULT_CONFIDENCE,
+        "--slo-confidence",
+        min=0.5,
+        max=0.999,
+        help="One-sided confidence for latency budgets; a case fails when the percentile's lower bound exceeds its budget.",
+    ),
 ):
     """スモーク実行
     
     :param base_url: 接続先
     :type base_url: str
+    :param targets: 接続先一覧ファイル（指定時は全接続先に対して並列実行）
+    :type targets: str | None
+    :param concurrency: 全体の同時実行数
+    :type concurrency: int
+    :param slo_confidence: レイテンシ予算判定の片側信頼度
+    :type slo_confidence: float
     """
 
-    #接続先URLを確定してHTTPクライアントを作る
-    client = MosClient(_base_url(base_url))
-
     #suites.pyからテストケースを読み込む
     cases = load_smoke_cases()
 
+    #複数接続先に対して実行し、結果を比較表示する
+    if targets:
+        results = run_targets(load_targets(targets), lambda c: run_smoke(c, cases, slo_confidence), concurrency)
+        _print_targets_table(results)
+        if any(r.failed for r in results):
+            raise typer.Exit(code=1)
+        print("[bold green]All smoke tests passed[/bold green]")
+        return
+
+    #接続先URLを確定してHTTPクライアントを作る
+    client = MosClient(_base_url(base_url))
+
     failures = 0    #失敗数カウント
 
     for c in cases:
         console.rule(f"[bold]{c['id']} {c['name']}[/bold]")
-        resp = client.post_orders(c["request"])
-        print(resp.raw_json)
 
-        #エラーが期待されるかどうかで分岐
-        exp = c["expect"]
-        if exp.get("is_error", False):
-            #エラー期待の場合
-            try:
-                validate_error_response(resp.raw_json)
-                if resp.raw_json.get("errorCode") != exp["errorCode"]:
-                    raise AssertionError(
-                        f"errorCode expected={exp['errorCode']} actual={resp.raw_json.get('errorCode')}"
-                    )
-            except Exception as e:
-                failures += 1
-                print(f"[red]FAIL[/red] {e}")
-                continue
-            print("[green]OK[/green]")
-        else:
-            #正常期待の場合
-            try:
-                validate_orders_response(resp.raw_json)
-            except Exception as e:
-                failures += 1
-                print(f"[red]FAIL[/red] {e}")
-                continue
-            print("[green]OK[/green]")
+        #期待値（正常/エラー）と突き合わせる。slo があれば繰り返し実行して応答時間も判定する
+        result, resp = run_case(client, c, slo_confidence)
+        if resp is not None:
+            print(resp.raw_json)
+        for line in result.latency:
+            print(f"[dim]{line}[/dim]")
+        if not result.ok:
+            failures += 1
+            print(f"[red]FAIL[/red] {result.error}")
+            continue
+        print("[green]OK[/green]")
 
     #1件でも失敗がある場合はexit code1
     if failures:
@@ -222,3 +513,224 @@ def smoke(
 
     #全て成功
     print("[bold green]All smoke tests passed[/bold green]")
+
+
+@app.command()
+def watch(
+    base_url: str = typer.Option(None, help="MOS base URL (or set MOS_BASE_URL)"),
+    interval: str = typer.Option("5s", "--interval", help="Polling interval, e.g. 5s, 500ms, 1m."),
+    window: str = typer.Option("6h", "--window", help="Sliding window ending now, e.g. 6h (ignored with --from/--to)."),
+    from_time: str | None = typer.Option(None, "--from", help="Fixed window start YYYY-MM-DDThh:mm:ss"),
+    to_time: str | None = typer.Option(None, "--to", help="Fixed window end YYYY-MM-DDThh:mm:ss"),
+    customer_id: str | None = typer.Option(None, "--customer-id", help="e.g. AA0001 (omit => null)"),
+    bill_flag: list[int] = typer.Option(
+        None,
+        "--bill-flag",
+        help="Billing status flags (bit): 1,2,4,8. Can specify multiple. Omit => null (all).",
+    ),
+    count: int = typer.Option(0, "--count", min=0, help="Stop after this many polls (0 => until Ctrl-C)."),
+    no_compress: bool = typer.Option(False, "--no-compress", help="Request identity encoding only."),
+):
+    """getOrdersを定期的に呼び出し、新規またはbillStatusが変わった注文だけを検証する
+
+    :param base_url: 接続先
+    :type base_url: str
+    :param interval: ポーリング間隔
+    :type interval: str
+    :param window: 現在時刻までのスライディングウィンドウの長さ
+    :type window: str
+    :param from_time: 固定ウィンドウの開始日時（--to と併用）
+    :type from_time: str | None
+    :param to_time: 固定ウィンドウの終了日時（--from と併用）
+    :type to_time: str | None
+    :param customer_id: 顧客ID
+    :type customer_id: str | None
+    :param bill_flag: billStatus
+    :type bill_flag: list[int]
+    :param count: ポーリング回数（0 は Ctrl-C まで）
+    :type count: int
+    :param no_compress: 圧縮転送を要求しない
+    :type no_compress: bool
+    """
+
+    try:
+        interval_sec = parse_duration(interval)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--interval")
+    try:
+        window_sec = parse_duration(window)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--window")
+
+    #接続先URLを確定してHTTPクライアントを作る
+    client = MosClient(_base_url(base_url), compress=not no_compress)
+
+    mask = _mask_from_flags(bill_flag)
+    index = WatchIndex(expected_bill_status_mask=mask)
+
+    failures = 0    #見つかった不正の累計
+    polls = 0
+
+    try:
+        while True:
+            started = time.perf_counter()
+
+            #ウィンドウを決める（固定指定がなければ現在時刻までのスライディングウィンドウ）
+            if from_time and to_time:
+                win_from, win_to = from_time, to_time
+            else:
+                now = datetime.now().replace(microsecond=0)
+                win_from = (now - timedelta(seconds=window_sec)).isoformat()
+                win_to = now.isoformat()
+
+            payload = [{
+                "method": "getOrders",
+                "customerId": customer_id,
+                "fromTime": win_from,
+                "toTime": win_to,
+                "billStatus": mask,
+            }]
+            #通信失敗は1回分のポーリング失敗として数え、監視は続ける
+            try:
+                resp = client.post_orders(payload)
+            except requests.RequestException as e:
+                resp = None
+                error = f"{type(e).__name__}: {e}"
+            stamp = datetime.now().strftime("%H:%M:%S")
+
+            if resp is None:
+                failures += 1
+                print(f"{stamp} [red]ERROR[/red] {error}")
+            elif resp.is_error or not isinstance(resp.raw_json, list):
+                failures += 1
+                print(f"{stamp} [red]ERROR[/red] {resp.raw_json}")
+            else:
+                check_started = time.perf_counter()
+                r = index.update(resp.raw_json, win_from, win_to)
+                check_ms = (time.perf_counter() - check_started) * 1000.0
+
+                #customerId指定時は最大1件（配列全体の条件なので毎回確認する）
+                if customer_id is not None and len(resp.raw_json) > 1:
+                    r.failures.append({"customerId": customer_id, "error": "customerId specified, but multiple orders returned."})
+
+                failures += len(r.failures)
+                status = f"[red]{len(r.failures)} FAIL[/red]" if r.failures else "[green]OK[/green]"
+                print(
+                    f"{stamp} {status} total={r.total} new={r.new} changed={r.changed} "
+                    f"evicted={r.evicted} server={resp.elapsed_ms:.1f}ms check={check_ms:.1f}ms"
+                )
+                for f in r.failures:
+                    print(f"  [red]FAIL[/red] {f}")
+
+            polls += 1
+            if count and polls >= count:
+                break
+            idle_sleep(max(0.0, interval_sec - (time.perf_counter() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+
+    print(f"[bold]{polls} polls, {len(index)} orders indexed ({index.invalid} invalid), {failures} failures[/bold]")
+    if failures:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def generate(
+    out: str = typer.Option(..., "--out", help="Output JSONL file ('-' => stdout)."),
+    count: int = typer.Option(..., "--count", min=1, help="Number of orders to generate."),
+    start: str = typer.Option("2025-11-24T19:00:00", "--start", help="First entryTime YYYY-MM-DDThh:mm:ss"),
+    stores: str = typer.Option("AA", "--stores", help="Comma-separated storeNo list, e.g. AA,AB,AC."),
+    orders_per_hour: float = typer.Option(120.0, "--orders-per-hour", min=0.001, help="Mean arrivals per hour (all stores)."),
+    items_mean: float = typer.Option(2.5, "--items-mean", min=1.0, help="Mean items per order (1 + Poisson)."),
+    items_max: int = typer.Option(20, "--items-max", min=1, help="Max items per order."),
+    bill_mix: str = typer.Option("1:0.4,2:0.2,4:0.3,8:0.1", "--bill-mix", help="billStatus weights, e.g. 1:0.4,2:0.2,4:0.3,8:0.1"),
+    customer_reuse: float = typer.Option(0.2, "--customer-reuse", min=0.0, max=1.0, help="Probability of reusing a known customerId."),
+    customer_gap: float = typer.Option(
+        24.0,
+        "--customer-gap",
+        min=0.0,
+        help="Minimum hours before a customerId orders again (keep it longer than the getOrders window).",
+    ),
+    seed: int | None = typer.Option(None, "--seed", help="Random seed for reproducible output."),
+    workers: int = typer.Option(os.cpu_count() or 1, "--workers", min=1, help="Generator processes."),
+):
+    """擬似注文データを生成して JSONL で書き出す
+
+    :param out: 出力先（"-" は標準出力）
+    :type out: str
+    :param count: 生成件数
+    :type count: int
+    :param start: 最初の来店日時
+    :type start: str
+    :param stores: 店舗番号（カンマ区切り）
+    :type stores: str
+    :param orders_per_hour: 1時間あたりの平均来店数
+    :type orders_per_hour: float
+    :param items_mean: 1注文あたりの平均明細数
+    :type items_mean: float
+    :param items_max: 1注文あたりの最大明細数
+    :type items_max: int
+    :param bill_mix: billStatus の重み
+    :type bill_mix: str
+    :param customer_reuse: customerId の再利用確率
+    :type customer_reuse: float
+    :param customer_gap: 同じ customerId が再び来店するまでの最短間隔（時間）
+    :type customer_gap: float
+    :param seed: 乱数シード
+    :type seed: int | None
+    :param workers: 生成プロセス数
+    :type workers: int
+    """
+    store_list = [x.strip() for x in stores.split(",") if x.strip()]
+    if not store_list or not all(RE_STORE.match(x) for x in store_list):
+        raise typer.BadParameter(f"Invalid storeNo list: {stores}", param_hint="--stores")
+    if not RE_TIME.match(start):
+        raise typer.BadParameter(f"Invalid time: {start}", param_hint="--start")
+    try:
+        mix = parse_bill_mix(bill_mix)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--bill-mix")
+
+    #最短間隔の間に1店舗へ来る注文数が customerId の数を超えると払い出せない
+    #来店数はポアソン分布でばらつくので、平均 + 6σ で判定する
+    arrivals = orders_per_hour / len(store_list) * customer_gap
+    if arrivals + 6.0 * math.sqrt(arrivals) >= CUSTOMER_IDS:
+        raise typer.BadParameter(
+            f"{orders_per_hour / len(store_list):g} orders/hour per store over {customer_gap:g}h "
+            f"may need more than {CUSTOMER_IDS} customerIds per store",
+            param_hint="--customer-gap",
+        )
+
+    config = WorkloadConfig(
+        start=start,
+        stores=store_list,
+        orders_per_hour=orders_per_hour,
+        items_mean=items_mean,
+        items_max=items_max,
+        bill_mix=mix,
+        customer_reuse=customer_reuse,
+        customer_gap_hours=customer_gap,
+        seed=seed,
+    )
+
+    started = time.perf_counter()
+    f = open_output(out)
+    try:
+        write_jsonl(config, count, f, workers=workers)
+    except ValueError as e:
+        #customerId の払い出しに失敗したら、途中までのファイルは残さない
+        if out != "-":
+            f.close()
+            os.remove(out)
+        raise typer.BadParameter(str(e), param_hint="--customer-gap")
+    finally:
+        if out != "-":
+            f.close()
+    elapsed = time.perf_counter() - started
+
+    #標準出力にデータを流している場合はメッセージを標準エラーへ出す
+    Console(stderr=True).print(
+        f"[dim]{count} orders in {elapsed:.1f}s ({count / elapsed * 60:,.0f} orders/min)[/dim]"
+    )
@@ -2,7 +2,32 @@
 """
 from __future__ import annotations
 from dataclasses import dataclass
+import json
+import time
+import zlib
 import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError, SSLError
+
+#任意の圧縮コーデック（インストールされている場合のみ有効）
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+CHUNK_SIZE = 64 * 1024     #レスポンスをストリームで読み出す際のチャンクサイズ
+
+#展開に失敗したときに各コーデックが投げる例外（通信エラーはここに含めない）
+DECODE_ERRORS: tuple = (ValueError, zlib.error)
+if brotli is not None:
+    DECODE_ERRORS += (brotli.error,)
+if zstandard is not None:
+    DECODE_ERRORS += (zstandard.ZstdError,)
 
 
 @dataclass
@@ -11,46 +36,262 @@ class MosResponse:
     """
     status_code: int    #HTTPステータスコード
     raw_json: object    #JSONとしてパースしたレスポンス
+    content_encoding: str = "identity"  #MOSが返したContent-Encoding
+    wire_bytes: int = 0     #転送されたバイト数（圧縮後）
+    body_bytes: int = 0     #展開後のバイト数
+    elapsed_ms: float = 0.0     #送信からボディ読み終わりまでの時間（展開を含む）
+    decompress_ms: float = 0.0  #elapsed_ms のうち展開にかかった時間
+    decode_ms: float = 0.0      #JSONデコードにかかった時間
 
     @property
     def is_error(self) -> bool:
         """errorCode の有無でエラー判定する
-        
+
         :param self: クライアント
         :return: エラーかどうか
         :rtype: bool
         """
         return isinstance(self.raw_json, dict) and "errorCode" in self.raw_json
 
+    @property
+    def compression_ratio(self) -> float:
+        """展開後サイズに対する転送サイズの比率（1.0 = 圧縮なし）
+
+        :param self: レスポンス
+        :return: wire_bytes / body_bytes
+        :rtype: float
+        """
+        if not self.body_bytes:
+            return 1.0
+        return self.wire_bytes / self.body_bytes
+
+
+def accept_encoding() -> str:
+    """このクライアントが展開できるコーデックを Accept-Encoding 形式で返す
+
+    gzip/deflate は標準ライブラリで常に対応し、br/zstd はライブラリがある場合のみ追加する
+
+    :return: Accept-Encoding ヘッダ値
+    :rtype: str
+    """
+    codecs = ["gzip", "deflate"]
+    if brotli is not None:
+        codecs.append("br")
+    if zstandard is not None:
+        codecs.append("zstd")
+    return ", ".join(codecs)
+
+
+class _IdentityDecoder:
+    """無圧縮レスポンス用（そのまま返す）
+    """
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _BrotliDecoder:
+    """brotli の Decompressor を zlib と同じインターフェースに揃える
+    """
+
+    def __init__(self):
+        self._d = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._d.process(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _DeflateDecoder:
+    """deflate 用。本来は zlib 形式だが生の deflate を返すサーバもあるため、
+    urllib3 と同じく先頭で展開に失敗したら生の deflate として読み直す
+    """
+
+    def __init__(self):
+        self._d = zlib.decompressobj()
+        self._first_try = True
+        self._data = b""
+
+    def decompress(self, data: bytes) -> bytes:
+        if not self._first_try:
+            return self._d.decompress(data)
+
+        self._data += data
+        try:
+            out = self._d.decompress(data)
+        except zlib.error:
+            self._first_try = False
+            self._d = zlib.decompressobj(-zlib.MAX_WBITS)
+            data, self._data = self._data, b""
+            return self._d.decompress(data)
+        if out:
+            self._first_try = False
+            self._data = b""
+        return out
+
+    def flush(self) -> bytes:
+        return self._d.flush()
+
+
+def make_decoder(content_encoding: str | None):
+    """Content-Encoding に応じたストリーム展開オブジェクトを返す
+
+    :param content_encoding: レスポンスの Content-Encoding
+    :type content_encoding: str | None
+    :return: decompress()/flush() を持つオブジェクト
+    """
+    enc = (content_encoding or "identity").strip().lower()
+    if enc in ("", "identity"):
+        return _IdentityDecoder()
+    if enc in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if enc == "deflate":
+        return _DeflateDecoder()
+    if enc == "br" and brotli is not None:
+        return _BrotliDecoder()
+    if enc == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+
+
+def _decompress(decoder, data: bytes | None) -> bytes:
+    """1チャンクを展開する（data が None なら残りを flush する）
+
+    展開はツール側の処理なので、プロファイラで通信時間と区別できるよう関数を分けている
+
+    :param decoder: make_decoder() の戻り値
+    :param data: 圧縮されたままのチャンク
+    :type data: bytes | None
+    :return: 展開後のバイト列
+    :rtype: bytes
+    """
+    if data is None:
+        return decoder.flush()
+    return decoder.decompress(data)
+
+
+def _iter_raw(r: requests.Response):
+    """圧縮されたままのボディをチャンクで返す
+
+    urllib3 の読み出しエラーは requests の iter_content() と同じく requests の例外に変換する
+
+    :param r: stream=True で受けたレスポンス
+    :type r: requests.Response
+    """
+    try:
+        yield from r.raw.stream(CHUNK_SIZE, decode_content=False)
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e)
+    except SSLError as e:
+        raise requests.exceptions.SSLError(e)
+
+
 class MosClient:
     """/api/orders への通信を引き受ける
     """
 
-    def __init__(self, base_url: str, timeout_sec: float = 10.0):
+    def __init__(self, base_url: str, timeout_sec: float = 10.0, compress: bool = True):
         """URL結合時の二重スラッシュ防止/通信ハングを防ぐためのタイムアウト秒
-        
+
         :param self: クライアント
         :param base_url: 接続先
         :type base_url: str
         :param timeout_sec: タイムアウト
         :type timeout_sec: float
+        :param compress: 圧縮転送を要求するか（False の場合は identity のみ）
+        :type compress: bool
         """
         self.base_url = base_url.rstrip("/")
         self.timeout_sec = timeout_sec
+        self.compress = compress
+
+        #接続先ごとにセッション（コネクションプール）を持ち、繰り返しのリクエストで接続を再利用する
+        self.session = requests.Session()
+
+    def close(self) -> None:
+        """セッションを閉じてプール中の接続を解放する
+
+        :param self: クライアント
+        """
+        self.session.close()
 
     def post_orders(self, payload):
         """/api/orders に POST するメソッド
-        
+
+        レスポンスは圧縮されたままストリームで受け取り、転送サイズを数えながら自前で展開する
+
         :param self: クライアント
         :param payload: リクエスト
         """
         url = f"{self.base_url}/api/orders"
-        r = requests.post(url, json=payload, timeout=self.timeout_sec)
+        headers = {"Accept-Encoding": accept_encoding() if self.compress else "identity"}
+
+        started = time.perf_counter()
+        data = None
+        with self.session.post(url, json=payload, headers=headers, timeout=self.timeout_sec, stream=True) as r:
+            encoding = r.headers.get("Content-Encoding", "identity")
+            wire_bytes = 0
+            body = bytearray()
+            decode_error = None
+            decompress_sec = 0.0
+
+            try:
+                decoder = make_decoder(encoding)
+            except ValueError as e:
+                decoder, decode_error = None, e
+
+            #decode_content=False で urllib3 の自動展開を止め、圧縮されたままのバイト数を数える。
+            #通信エラー（タイムアウト・途中切断）はそのまま requests の例外として投げる
+            #展開にかかった時間は別に数える（None で最後に flush する）
+            for chunk in _iter_raw(r):
+                wire_bytes += len(chunk)
+                if decoder is None:
+                    continue
+                t = time.perf_counter()
+                try:
+                    body += _decompress(decoder, chunk)
+                except DECODE_ERRORS as e:
+                    decoder, decode_error = None, e
+                decompress_sec += time.perf_counter() - t
+
+            if decoder is not None:
+                t = time.perf_counter()
+                try:
+                    body += _decompress(decoder, None)
+                except DECODE_ERRORS as e:
+                    decode_error = e
+                decompress_sec += time.perf_counter() - t
+
+            #展開できないレスポンスは擬似エラー扱いする
+            if decode_error is not None:
+                data = {"errorCode": "INVALID_CONTENT_ENCODING", "message": f"Response could not be decoded: {decode_error}"}
+
+        #応答時間はボディを読み終わるまで（JSONデコードはツール側の時間として分ける）
+        decode_started = time.perf_counter()
+        elapsed_ms = (decode_started - started) * 1000.0
 
         #JSONとして解釈できないレスポンスは擬似エラー扱いする
-        try:
-            data = r.json()
-        except Exception:
-            data = {"errorCode": "INVALID_JSON_FORMAT", "message": "Response is not valid JSON."}
-            
-        return MosResponse(status_code=r.status_code, raw_json=data)
+        if data is None:
+            try:
+                data = json.loads(body)
+            except Exception:
+                data = {"errorCode": "INVALID_JSON_FORMAT", "message": "Response is not valid JSON."}
+        decode_ms = (time.perf_counter() - decode_started) * 1000.0
+
+        return MosResponse(
+            status_code=r.status_code,
+            raw_json=data,
+            content_encoding=encoding,
+            wire_bytes=wire_bytes,
+            body_bytes=len(body),
+            elapsed_ms=elapsed_ms,
+            decompress_ms=decompress_sec * 1000.0,
+            decode_ms=decode_ms,
+        )
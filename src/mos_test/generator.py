@@ -0,0 +1,327 @@
+"""擬似注文データ（ワークロード）の生成
+
+models.Order/Item と validators.py の正規表現を満たし、compute_order_hash_v1 で正しい hash を持つ注文を作る。
+ベンチマーク、代替サーバ、ダンプ検証のテストデータ用に JSONL でストリーム出力する
+"""
+from __future__ import annotations
+import json
+import math
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from mos_test.hash_rules import compute_order_hash_v1
+
+CHUNK_ORDERS = 50_000   #1ワーカーが1回に生成する注文数
+CUSTOMER_IDS = 10_000   #店舗ごとの customerId の数（0000..9999）
+
+#メニューの単価帯（円）と税率。F=フード（テイクアウト前提で8%）、D=ドリンク（10%）
+_PRICE_STEPS = {"F": (300, 1500), "D": (150, 600)}
+_TAX_RATE = {"F": 8, "D": 10}
+
+
+@dataclass
+class WorkloadConfig:
+    """生成する注文の分布
+
+    - orders_per_hour: 全店舗合計の平均来店数（到着はポアソン過程）
+    - items_mean: 1注文あたりの平均明細数（1 + ポアソン分布、items_max で打ち切り）
+    - bill_mix: billStatus（1/2/4/8）ごとの重み
+    - customer_reuse: 既存の customerId を再利用する確率
+    - customer_gap_hours: 同じ customerId が再び来店するまでの最短間隔。getOrders の検索範囲より長くし、
+      1つのウィンドウに同じ customerId の注文が2件入らないようにする
+    """
+    start: str = "2025-11-24T19:00:00"
+    stores: List[str] = field(default_factory=lambda: ["AA"])
+    orders_per_hour: float = 120.0
+    items_mean: float = 2.5
+    items_max: int = 20
+    bill_mix: Dict[int, float] = field(default_factory=lambda: {1: 0.4, 2: 0.2, 4: 0.3, 8: 0.1})
+    customer_reuse: float = 0.2
+    customer_gap_hours: float = 24.0
+    menu_size: int = 200
+    seed: Optional[int] = None
+
+
+def parse_bill_mix(text: str) -> Dict[int, float]:
+    """"1:0.4,2:0.2,4:0.3,8:0.1" 形式の billStatus の重みを読む
+
+    :param text: billStatus:重み のカンマ区切り
+    :type text: str
+    :return: billStatus → 重み
+    :rtype: Dict[int, float]
+    """
+    mix = {}
+    for part in text.split(","):
+        status, _, weight = part.partition(":")
+        mix[int(status)] = float(weight)
+    if not mix or any(s not in (1, 2, 4, 8) for s in mix) or sum(mix.values()) <= 0:
+        raise ValueError(f"Invalid bill mix: {text}")
+    return mix
+
+
+def _items_weights(mean: float, max_items: int) -> List[float]:
+    """明細数 1..max_items の重み（1 + ポアソン分布）
+    """
+    lam = max(mean - 1.0, 0.0)
+    #lam ** k / k! は k が大きいと桁あふれするので漸化式で作る（相対比だけ使うので exp(-lam) は掛けない）
+    weights = [1.0]
+    for k in range(1, max_items):
+        weights.append(weights[-1] * lam / k)
+    return weights
+
+
+def _menu(rng: random.Random, size: int) -> List[Dict[str, Any]]:
+    """メニュー表（menuId/単価/税率/カテゴリ）を作る
+    """
+    menu = []
+    for i in range(size):
+        kind = "F" if i % 3 else "D"
+        lo, hi = _PRICE_STEPS[kind]
+        menu.append({
+            "menuId": f"{kind}{i % 1000:03d}",
+            "unitPrice": rng.randrange(lo, hi + 1, 10),
+            "taxRate": _TAX_RATE[kind],
+            "categoryId": f"{kind}{i % 10:02d}",
+        })
+    return menu
+
+
+class _StoreCustomers:
+    """1店舗分の customerId の払い出し状況
+
+    直近 gap_sec 以内に来店した顧客は再利用の候補にも新規の払い出しにも使わない
+    """
+
+    def __init__(self, store: str, gap_sec: float):
+        self.store = store
+        self.gap_sec = gap_sec
+        self.next = 0                                   #新規に払い出す番号（CUSTOMER_IDS で循環）
+        self.recent: Deque[Tuple[int, str]] = deque()   #gap_sec 以内の (来店時刻, customerId)
+        self.busy = set()                               #recent にいる customerId
+        self.returning: List[str] = []                  #再来店できる既存顧客
+        self._pos: Dict[str, int] = {}                  #customerId → returning 内の位置
+
+    def _release(self, now: int) -> None:
+        """最短間隔を過ぎた顧客を再利用の候補に戻す
+        """
+        while self.recent and now - self.recent[0][0] >= self.gap_sec:
+            _, cid = self.recent.popleft()
+            self.busy.discard(cid)
+            self._pos[cid] = len(self.returning)
+            self.returning.append(cid)
+
+    def _take(self, cid: str) -> None:
+        """再利用の候補から外す（末尾と入れ替えて O(1) で消す）
+        """
+        i = self._pos.pop(cid)
+        last = self.returning.pop()
+        if last != cid:
+            self.returning[i] = last
+            self._pos[last] = i
+
+    def assign(self, rng: random.Random, reuse: float, now: int) -> str:
+        """now に来店した注文の customerId を決める
+
+        :param rng: 乱数
+        :type rng: random.Random
+        :param reuse: 既存の顧客を再利用する確率
+        :type reuse: float
+        :param now: 来店時刻（開始からの秒）
+        :type now: int
+        :return: customerId
+        :rtype: str
+        """
+        self._release(now)
+        if self.returning and rng.random() < reuse:
+            cid = self.returning[rng.randrange(len(self.returning))]
+            self._take(cid)
+        else:
+            for _ in range(CUSTOMER_IDS):
+                cid = f"{self.store}{self.next % CUSTOMER_IDS:04d}"
+                self.next += 1
+                if cid not in self.busy:
+                    break
+            else:
+                raise ValueError(
+                    f"All {CUSTOMER_IDS} customerIds of store {self.store} were used within "
+                    f"{self.gap_sec / 3600.0:g}h; lower the order rate or the customer gap"
+                )
+            #循環して既存の顧客番号に戻った場合は、その顧客の再来店として扱う
+            if cid in self._pos:
+                self._take(cid)
+
+        self.recent.append((now, cid))
+        self.busy.add(cid)
+        return cid
+
+
+def _with_seed(config: WorkloadConfig) -> WorkloadConfig:
+    """シード未指定なら1つに決める（メニュー表と来店の系列を全チャンクで揃えるため）
+    """
+    if config.seed is None:
+        return replace(config, seed=random.randrange(2 ** 32))
+    return config
+
+
+def _chunk_sizes(count: int) -> List[int]:
+    """count 件を CHUNK_ORDERS 件ずつに分けたときの各チャンクの件数
+    """
+    return [min(CHUNK_ORDERS, count - i) for i in range(0, count, CHUNK_ORDERS)]
+
+
+def _plan_chunks(config: WorkloadConfig, sizes: List[int]) -> Iterator[List[Tuple[int, str, str]]]:
+    """チャンクごとに、各注文の (来店時刻の秒, storeNo, customerId) を決める（親プロセスで実行）
+
+    来店時刻と顧客の再来店はチャンクをまたいで続くので、ワーカーに分ける前にここで順に決める。
+    明細や hash の生成に比べて十分軽い
+
+    :param config: 分布の設定（シード確定済み）
+    :type config: WorkloadConfig
+    :param sizes: 各チャンクの件数
+    :type sizes: List[int]
+    :return: チャンクごとの来店計画
+    :rtype: Iterator[List[Tuple[int, str, str]]]
+    """
+    rng = random.Random(f"{config.seed}:arrivals")
+    rate_per_sec = config.orders_per_hour / 3600.0
+    gap_sec = config.customer_gap_hours * 3600.0
+    customers = {s: _StoreCustomers(s, gap_sec) for s in config.stores}
+
+    t = 0.0
+    for size in sizes:
+        plan = []
+        for _ in range(size):
+            t += rng.expovariate(rate_per_sec)
+            now = int(t)
+            store = rng.choice(config.stores)
+            plan.append((now, store, customers[store].assign(rng, config.customer_reuse, now)))
+        yield plan
+
+
+def _build_orders(config: WorkloadConfig, plan: List[Tuple[int, str, str]], chunk: int) -> Iterator[Dict[str, Any]]:
+    """来店計画に明細と billStatus を付けて注文にする（ワーカープロセスで実行）
+
+    乱数系列はチャンク番号で分けるので、ワーカー数に関係なく同じ注文になる
+
+    :param config: 分布の設定（シード確定済み）
+    :type config: WorkloadConfig
+    :param plan: _plan_chunks() の1チャンク分
+    :type plan: List[Tuple[int, str, str]]
+    :param chunk: チャンク番号
+    :type chunk: int
+    :return: 注文（hash付き）
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    rng = random.Random(config.seed * 1_000_003 + chunk)
+    menu = _menu(random.Random(config.seed), config.menu_size)
+    statuses = list(config.bill_mix)
+    status_weights = list(config.bill_mix.values())
+    items_counts = list(range(1, config.items_max + 1))
+    items_weights = _items_weights(config.items_mean, config.items_max)
+    base = datetime.fromisoformat(config.start)
+
+    for now, store, customer_id in plan:
+        entry = base + timedelta(seconds=now)
+
+        items = []
+        offset = 0
+        for m in rng.choices(menu, k=rng.choices(items_counts, items_weights)[0]):
+            #追加注文は来店から数分おきに発生する
+            offset += rng.randrange(0, 600)
+            qty = 1 if rng.random() < 0.8 else rng.randint(2, 4)
+            items.append({
+                "orderTime": (entry + timedelta(seconds=offset)).isoformat(),
+                "menuId": m["menuId"],
+                "unitPrice": m["unitPrice"],
+                "taxRate": m["taxRate"],
+                "orderQty": qty,
+                "offerQty": qty if rng.random() < 0.9 else rng.randint(0, qty),
+                "categoryId": m["categoryId"],
+            })
+
+        order = {
+            "storeNo": store,
+            "customerId": customer_id,
+            "entryTime": entry.isoformat(),
+            "billStatus": rng.choices(statuses, status_weights)[0],
+            "items": items,
+        }
+        order["hash"] = compute_order_hash_v1(order)
+        yield order
+
+
+def generate_orders(config: WorkloadConfig, count: int) -> Iterator[Dict[str, Any]]:
+    """注文を count 件、entryTime の順に生成する（write_jsonl() と同じ内容）
+
+    :param config: 分布の設定
+    :type config: WorkloadConfig
+    :param count: 生成する件数
+    :type count: int
+    :return: 注文（hash付き）
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    config = _with_seed(config)
+    for chunk, plan in enumerate(_plan_chunks(config, _chunk_sizes(count))):
+        yield from _build_orders(config, plan, chunk)
+
+
+def _render_chunk(config: WorkloadConfig, plan: List[Tuple[int, str, str]], chunk: int) -> bytes:
+    """1チャンク分を JSONL のバイト列にする（ワーカープロセスで実行）
+    """
+    dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+    return "".join(dumps(o) + "\n" for o in _build_orders(config, plan, chunk)).encode("utf-8")
+
+
+def write_jsonl(config: WorkloadConfig, count: int, out: IO[bytes], workers: int = 1) -> int:
+    """注文を count 件生成して JSONL で書き出す
+
+    CHUNK_ORDERS 件ずつに分け、workers > 1 ならプロセス並列で生成する。来店時刻と customerId は
+    親プロセスで順に決めてから渡すので、書き出しは entryTime の順になる。
+    同時に保持するチャンク数は workers の2倍までに抑える
+
+    :param config: 分布の設定
+    :type config: WorkloadConfig
+    :param count: 生成する件数
+    :type count: int
+    :param out: 書き出し先（バイナリ）
+    :type out: IO[bytes]
+    :param workers: 生成プロセス数
+    :type workers: int
+    :return: 書き出した件数
+    :rtype: int
+    """
+    config = _with_seed(config)
+    plans = _plan_chunks(config, _chunk_sizes(count))
+
+    if workers <= 1:
+        for chunk, plan in enumerate(plans):
+            out.write(_render_chunk(config, plan, chunk))
+        return count
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk, plan in enumerate(plans):
+            pending.append(pool.submit(_render_chunk, config, plan, chunk))
+            if len(pending) >= workers * 2:
+                out.write(pending.pop(0).result())
+        for f in pending:
+            out.write(f.result())
+    return count
+
+
+def open_output(path: str) -> IO[bytes]:
+    """"-" なら標準出力、それ以外はファイルをバイナリで開く
+
+    :param path: 出力先
+    :type path: str
+    :return: 書き出し先
+    :rtype: IO[bytes]
+    """
+    if path == "-":
+        return sys.stdout.buffer
+    return open(path, "wb")
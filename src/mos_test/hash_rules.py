@@ -4,6 +4,9 @@ from __future__ import annotations
 import hashlib
 from typing import Any, Dict, List, Tuple
 
+#compute_order_hash_v1 のルール版数。ルールを変えたら上げる（検証結果キャッシュの無効化に使う）
+HASH_RULE_VERSION = "v1"
+
 
 def _norm(v: Any) -> str:
     """ハッシュ用に値を安定した文字列へ正規化する
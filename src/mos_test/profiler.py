@@ -0,0 +1,185 @@
+"""CLI実行のサンプリングプロファイラ
+
+一定間隔で全スレッドのスタックを採取し、時間がどこで使われたか（MOS側/ツール側）を集計する。
+採取したスタックは flamegraph.pl / speedscope などで読める collapsed 形式で書き出す
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import List, Optional, Tuple
+
+DEFAULT_INTERVAL_SEC = 0.001    #サンプリング間隔
+
+#MOS側（通信）として扱うカテゴリ。それ以外はツール側のオーバーヘッド
+SERVER_CATEGORY = "client.post_orders (server+transfer)"
+DECOMPRESS_CATEGORY = "decompress"
+OTHER_CATEGORY = "other (tool)"
+
+#待機中とみなして集計しないモジュール（ThreadPoolExecutor の待ちなど）
+_IDLE_FILES = (
+    os.path.join("concurrent", "futures", ""),
+    f"{os.sep}threading.py",
+    f"{os.sep}queue.py",
+)
+
+
+def idle_sleep(seconds: float) -> None:
+    """待機する。プロファイラはこの関数の中にいるサンプルを集計しない
+
+    time.sleep は C 関数でフレームを持たず、呼び出し元（コマンド関数）の時間に見えてしまうため、
+    ポーリング間隔などの待機はこれを使う
+
+    :param seconds: 待機する秒数
+    :type seconds: float
+    """
+    time.sleep(seconds)
+
+
+def _category(frame: FrameType) -> Optional[str]:
+    """1フレームが属するカテゴリを返す（該当しなければ None）
+
+    :param frame: スタックフレーム
+    :type frame: FrameType
+    :return: カテゴリ名
+    :rtype: Optional[str]
+    """
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.endswith((os.path.join("json", "decoder.py"), os.path.join("json", "__init__.py"))):
+        return "JSON decode"
+    if code.co_name == "compute_order_hash_v1":
+        return "compute_order_hash_v1"
+    if filename.endswith(os.path.join("mos_test", "validators.py")):
+        return "validate_orders_response"
+    if f"{os.sep}rich{os.sep}" in filename:
+        return "rich output"
+    if filename.endswith(os.path.join("mos_test", "client.py")):
+        #zlib などの展開は C 関数でフレームを持たないので、呼び出し元の _decompress で判定する
+        if code.co_name == "_decompress":
+            return DECOMPRESS_CATEGORY
+        if code.co_name == "post_orders":
+            return SERVER_CATEGORY
+    return None
+
+
+def _label(frame: FrameType) -> str:
+    """collapsed 形式での1フレームの表記（関数名 (ファイル:行)）
+    """
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """別スレッドから一定間隔でスタックを採取するプロファイラ
+
+    各サンプルは前回採取からの経過時間で重み付けする（GILで採取が遅れても時間が偏らない）
+    """
+
+    def __init__(self, interval_sec: float = DEFAULT_INTERVAL_SEC):
+        """プロファイラを作る（start() で採取開始）
+
+        :param self: プロファイラ
+        :param interval_sec: サンプリング間隔（秒）
+        :type interval_sec: float
+        """
+        self.interval_sec = interval_sec
+        self.stacks: Counter[str] = Counter()       #collapsed スタック → 時間（μs）
+        self.categories: Counter[str] = Counter()   #カテゴリ → 時間（秒）
+        self.wall_sec = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        """採取を開始する
+
+        :param self: プロファイラ
+        """
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="mos-test-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """採取を止める
+
+        :param self: プロファイラ
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.wall_sec = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        """採取ループ（プロファイラスレッド）
+        """
+        me = threading.get_ident()
+        names = {}
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval_sec):
+            now = time.perf_counter()
+            dt = now - last
+            last = now
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                self._sample(names.get(ident, str(ident)), frame, dt)
+
+    def _sample(self, thread_name: str, frame: FrameType, dt: float) -> None:
+        """1スレッド分のスタックを集計する
+        """
+        if frame.f_code is idle_sleep.__code__:
+            return
+        if any(idle in frame.f_code.co_filename for idle in _IDLE_FILES):
+            return
+
+        category = None
+        labels = []
+        f: Optional[FrameType] = frame
+        while f is not None:
+            if category is None:
+                category = _category(f)
+            labels.append(_label(f))
+            f = f.f_back
+
+        labels.append(thread_name)
+        self.stacks[";".join(reversed(labels))] += max(1, round(dt * 1_000_000))
+        self.categories[category or OTHER_CATEGORY] += dt
+
+    def write_collapsed(self, path: str) -> None:
+        """collapsed 形式（"root;...;leaf 値"）で書き出す。値は μs
+
+        :param self: プロファイラ
+        :param path: 出力先
+        :type path: str
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, us in self.stacks.most_common():
+                f.write(f"{stack} {us}\n")
+
+    def summary(self) -> List[Tuple[str, float, float]]:
+        """カテゴリごとの (カテゴリ, 時間ms, 割合%) を時間の多い順に返す
+
+        :param self: プロファイラ
+        :return: 集計結果
+        :rtype: List[Tuple[str, float, float]]
+        """
+        total = sum(self.categories.values()) or 1.0
+        return [(name, sec * 1000.0, sec / total * 100.0) for name, sec in self.categories.most_common()]
+
+    @property
+    def server_ms(self) -> float:
+        """MOS側（通信）の時間
+        """
+        return self.categories[SERVER_CATEGORY] * 1000.0
+
+    @property
+    def tool_ms(self) -> float:
+        """ツール側の時間（通信以外の合計）
+        """
+        return sum(sec for name, sec in self.categories.items() if name != SERVER_CATEGORY) * 1000.0
@@ -0,0 +1,370 @@
+"""スモーク/getOrders の検証を実行し、結果を集計する
+
+複数の MOS（店舗ごと）に対して同じスイートを並列実行するためのヘルパもここに置く
+"""
+from __future__ import annotations
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from mos_test.cache import VerifiedCache, validate_orders_cached
+from mos_test.client import MosClient, MosResponse
+from mos_test.hash_rules import compute_order_hash_v1
+from mos_test.stats import percentile, percentile_bounds
+from mos_test.validators import validate_orders_response, validate_error_response
+
+
+DEFAULT_CONFIDENCE = 0.9    #レイテンシ予算判定に使う片側信頼度
+
+#slo の予算キー（max_p95_ms など）と、それ以外に使えるキー
+RE_BUDGET = re.compile(r"^max_p(\d+(?:\.\d+)?)_ms$")
+SLO_KEYS = ("repeat", "warmup")
+
+
+@dataclass
+class CaseResult:
+    """1ケース（1リクエスト）の実行結果
+    """
+    case_id: str
+    name: str
+    ok: bool
+    error: Optional[str] = None     #失敗理由
+    elapsed_ms: Optional[float] = None  #レスポンスが無かった（通信失敗）場合は None
+    hash_mismatches: int = 0
+    samples: List[float] = field(default_factory=list)     #ウォームアップを除いた応答時間（ms）
+    latency: List[str] = field(default_factory=list)    #予算ごとの判定結果（表示用）
+
+
+@dataclass
+class TargetResult:
+    """1接続先に対してスイートを実行した結果
+    """
+    label: str
+    base_url: str
+    cases: List[CaseResult] = field(default_factory=list)
+    error: Optional[str] = None     #通信失敗などでスイート自体を実行できなかった場合
+
+    @property
+    def passed(self) -> int:
+        return sum(1 for c in self.cases if c.ok)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for c in self.cases if not c.ok) + (1 if self.error else 0)
+
+    @property
+    def hash_mismatches(self) -> int:
+        return sum(c.hash_mismatches for c in self.cases)
+
+    def latency_percentile(self, q: float) -> float:
+        """このターゲットの応答時間のパーセンタイル（ms）
+
+        レスポンスが無かったケース（通信失敗）は応答時間に含めない
+
+        :param q: パーセンタイル（0..100）
+        :type q: float
+        :return: 応答時間（サンプルが無ければ nan）
+        :rtype: float
+        """
+        samples = []
+        for c in self.cases:
+            if c.samples:
+                samples.extend(c.samples)
+            elif c.elapsed_ms is not None:
+                samples.append(c.elapsed_ms)
+        return percentile(samples, q)
+
+
+def load_targets(path: str) -> List[tuple[str, str]]:
+    """ターゲット一覧ファイルを読み込む
+
+    1行1接続先。"URL" または "ラベル URL" の形式で書く。空行と # 以降は無視する
+
+    :param path: ファイルパス
+    :type path: str
+    :return: (ラベル, URL) のリスト
+    :rtype: List[tuple[str, str]]
+    """
+    targets = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) == 1:
+                targets.append((parts[0], parts[0]))
+            elif len(parts) == 2:
+                targets.append((parts[0], parts[1]))
+            else:
+                raise ValueError(f"Invalid targets line: {line}")
+    return targets
+
+
+def find_hash_mismatches(orders: Any) -> List[Dict[str, Any]]:
+    """hashを再計算し、MOS返却hashと一致しない注文を返す
+
+    :param orders: getOrders の返却JSON（注文配列）
+    :type orders: Any
+    :return: 不一致の注文（storeNo/customerId/actual/expected）
+    :rtype: List[Dict[str, Any]]
+    """
+    mismatches = []
+    for o in orders:
+        expected = compute_order_hash_v1(o)
+        if o.get("hash") != expected:
+            mismatches.append({
+                "storeNo": o.get("storeNo"),
+                "customerId": o.get("customerId"),
+                "actual": o.get("hash"),
+                "expected": expected,
+            })
+    return mismatches
+
+
+def check_case(resp: MosResponse, expect: Dict[str, Any]) -> None:
+    """スモークケースの期待値とレスポンスを突き合わせる（不一致は例外）
+
+    :param resp: MOSからのレスポンス
+    :type resp: MosResponse
+    :param expect: suites.py の expect
+    :type expect: Dict[str, Any]
+    """
+
+    #エラーが期待されるかどうかで分岐
+    if expect.get("is_error", False):
+        validate_error_response(resp.raw_json)
+        if resp.raw_json.get("errorCode") != expect["errorCode"]:
+            raise AssertionError(
+                f"errorCode expected={expect['errorCode']} actual={resp.raw_json.get('errorCode')}"
+            )
+    else:
+        validate_orders_response(resp.raw_json)
+
+
+def check_slo(slo: Dict[str, Any]) -> tuple[int, int]:
+    """slo の設定を検証して (warmup, repeat) を返す
+
+    予算キーの書き間違い（max_p95ms など）が黙って無視されないよう、未知のキーはエラーにする
+
+    :param slo: ケースの slo
+    :type slo: Dict[str, Any]
+    :return: (warmup, repeat)
+    :rtype: tuple[int, int]
+    """
+    for key in slo:
+        m = RE_BUDGET.match(key)
+        if m is None and key not in SLO_KEYS:
+            raise ValueError(f"Unknown slo key: {key}")
+        if m is not None and float(m.group(1)) > 100:
+            raise ValueError(f"Invalid percentile in slo key: {key}")
+
+    warmup = int(slo.get("warmup", 0))
+    repeat = int(slo.get("repeat", 1))
+    if repeat < 1:
+        raise ValueError(f"slo repeat must be >= 1: {repeat}")
+    if warmup < 0:
+        raise ValueError(f"slo warmup must be >= 0: {warmup}")
+    return warmup, repeat
+
+
+def check_latency(samples: List[float], slo: Dict[str, Any], confidence: float) -> tuple[List[str], List[str]]:
+    """応答時間のサンプルを slo の予算（max_pNN_ms）と比較する
+
+    パーセンタイルの信頼区間の下限が予算を超えた場合のみ違反とする。
+    サンプル数が少なく偶然遅かっただけのケースで落ちないようにするため
+
+    :param samples: ウォームアップを除いた応答時間（ms）
+    :type samples: List[float]
+    :param slo: ケースの slo
+    :type slo: Dict[str, Any]
+    :param confidence: 片側信頼度
+    :type confidence: float
+    :return: (判定結果の表示用文字列, 違反内容)
+    :rtype: tuple[List[str], List[str]]
+    """
+    check_slo(slo)
+    lines = []
+    violations = []
+    for key, budget in slo.items():
+        m = RE_BUDGET.match(key)
+        if not m:
+            continue
+        if not samples:
+            raise ValueError(f"No latency samples for {key}")
+        q = float(m.group(1))
+        lo, hi = percentile_bounds(samples, q, confidence)
+        line = (
+            f"p{m.group(1)}={percentile(samples, q):.1f}ms "
+            f"[{lo:.1f}, {hi:.1f}] budget={budget}ms (n={len(samples)})"
+        )
+        lines.append(line)
+        if lo > budget:
+            violations.append(f"latency budget exceeded: {line}")
+    return lines, violations
+
+
+def run_case(
+    client: MosClient,
+    case: Dict[str, Any],
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> tuple[CaseResult, Optional[MosResponse]]:
+    """スモークケースを1件実行する
+
+    slo が指定されていれば repeat 回実行し、先頭の warmup 回を除いた応答時間で予算を判定する。
+    レスポンスの検証は毎回行い、正常系は最後のレスポンスのhashを再計算する。
+    通信に失敗した場合はレスポンスなし（None）で失敗として返す
+
+    :param client: 接続先ごとのクライアント
+    :type client: MosClient
+    :param case: suites.py の1ケース
+    :type case: Dict[str, Any]
+    :param confidence: 片側信頼度
+    :type confidence: float
+    :return: (結果, 最後のレスポンス)
+    :rtype: tuple[CaseResult, Optional[MosResponse]]
+    """
+    slo = case.get("slo") or {}
+    warmup, repeat = check_slo(slo)
+
+    result = CaseResult(case["id"], case["name"], ok=True)
+    resp = None
+    for i in range(warmup + repeat):
+        try:
+            resp = client.post_orders(case["request"])
+        except requests.RequestException as e:
+            #通信失敗はこのケースの失敗として記録し、残りのケースは続ける
+            result.ok = False
+            result.error = f"{type(e).__name__}: {e}"
+            return result, resp
+        try:
+            check_case(resp, case["expect"])
+        except Exception as e:
+            result.ok = False
+            result.error = str(e)
+            result.elapsed_ms = resp.elapsed_ms
+            return result, resp
+        if i >= warmup:
+            result.samples.append(resp.elapsed_ms)
+
+    #正常系（注文配列）はhashも再計算して突き合わせる
+    if not case["expect"].get("is_error", False):
+        mismatches = find_hash_mismatches(resp.raw_json)
+        result.hash_mismatches = len(mismatches)
+        if mismatches:
+            result.ok = False
+            result.error = f"{len(mismatches)} hash mismatches"
+            result.elapsed_ms = resp.elapsed_ms
+            return result, resp
+
+    result.elapsed_ms = percentile(result.samples, 50)
+    result.latency, violations = check_latency(result.samples, slo, confidence)
+    if violations:
+        result.ok = False
+        result.error = "; ".join(violations)
+    return result, resp
+
+
+def run_smoke(
+    client: MosClient,
+    cases: List[Dict[str, Any]],
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> List[CaseResult]:
+    """スモークケースを順に実行する（表示は行わない）
+
+    :param client: 接続先ごとのクライアント
+    :type client: MosClient
+    :param cases: load_smoke_cases() の戻り値
+    :type cases: List[Dict[str, Any]]
+    :param confidence: 片側信頼度
+    :type confidence: float
+    :return: ケースごとの結果
+    :rtype: List[CaseResult]
+    """
+    return [run_case(client, c, confidence)[0] for c in cases]
+
+
+def run_get_orders(
+    client: MosClient,
+    payload: Any,
+    cache: Optional[VerifiedCache] = None,
+    **expected: Any,
+) -> List[CaseResult]:
+    """getOrders を1回実行し、スキーマ/条件/ハッシュを検証する（表示は行わない）
+
+    :param client: 接続先ごとのクライアント
+    :type client: MosClient
+    :param payload: getOrders リクエスト
+    :type payload: Any
+    :param cache: 検証結果キャッシュ（None なら毎回検証する）
+    :type cache: Optional[VerifiedCache]
+    :param expected: validate_orders_response() に渡す条件
+    :return: 1件の結果
+    :rtype: List[CaseResult]
+    """
+    try:
+        resp = client.post_orders(payload)
+    except requests.RequestException as e:
+        return [CaseResult("getOrders", "getOrders", ok=False, error=f"{type(e).__name__}: {e}")]
+    if resp.is_error:
+        return [CaseResult("getOrders", "getOrders", ok=False, error=str(resp.raw_json), elapsed_ms=resp.elapsed_ms)]
+    try:
+        if cache is not None:
+            mismatches = validate_orders_cached(resp.raw_json, cache, **expected)
+        else:
+            validate_orders_response(resp.raw_json, **expected)
+            mismatches = find_hash_mismatches(resp.raw_json)
+    except Exception as e:
+        return [CaseResult("getOrders", "getOrders", ok=False, error=str(e), elapsed_ms=resp.elapsed_ms)]
+
+    return [CaseResult(
+        "getOrders",
+        "getOrders",
+        ok=not mismatches,
+        error=f"{len(mismatches)} hash mismatches" if mismatches else None,
+        elapsed_ms=resp.elapsed_ms,
+        hash_mismatches=len(mismatches),
+    )]
+
+
+def run_targets(
+    targets: List[tuple[str, str]],
+    suite: Callable[[MosClient], List[CaseResult]],
+    concurrency: int,
+    make_client: Callable[[str], MosClient] = MosClient,
+) -> List[TargetResult]:
+    """複数の接続先に対して同じスイートを並列実行する
+
+    接続先ごとにクライアント（＝コネクションプール）を分け、ケースは接続先内で順に実行する。
+    同時に処理する接続先数を concurrency で制限するので、全体の同時リクエスト数もその値を超えない
+
+    :param targets: (ラベル, URL) のリスト
+    :type targets: List[tuple[str, str]]
+    :param suite: クライアントを受け取りケース結果を返す関数
+    :type suite: Callable[[MosClient], List[CaseResult]]
+    :param concurrency: 全体の同時実行数
+    :type concurrency: int
+    :param make_client: URLからクライアントを作る関数
+    :type make_client: Callable[[str], MosClient]
+    :return: 入力と同じ順序の結果
+    :rtype: List[TargetResult]
+    """
+
+    def run_one(target: tuple[str, str]) -> TargetResult:
+        label, url = target
+        result = TargetResult(label=label, base_url=url)
+        client = make_client(url)
+        try:
+            result.cases = suite(client)
+        except requests.RequestException as e:
+            #ケース単位で記録できなかった通信失敗（suite 側で拾わなかったもの）
+            result.error = f"{type(e).__name__}: {e}"
+        finally:
+            client.close()
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(run_one, targets))
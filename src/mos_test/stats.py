@@ -0,0 +1,98 @@
+"""レイテンシ集計用の統計処理
+"""
+from __future__ import annotations
+import math
+from typing import List, Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """線形補間でパーセンタイルを求める
+
+    :param values: 測定値
+    :type values: Sequence[float]
+    :param q: パーセンタイル（0..100）
+    :type q: float
+    :return: パーセンタイル値（値が無い場合は nan）
+    :rtype: float
+    """
+    if not values:
+        return math.nan
+
+    xs = sorted(values)
+    pos = (len(xs) - 1) * q / 100.0
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    if lo == hi:
+        return xs[lo]
+    return xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+
+
+def _binom_cdfs(n: int, p: float) -> List[float]:
+    """二項分布 Binomial(n, p) の累積確率 P(X <= k) を k = 0..n についてまとめて求める
+
+    各項は対数（lgamma）で計算する。math.comb の巨大な整数を float にすると n が千程度で溢れるため
+
+    :param n: 試行回数
+    :type n: int
+    :param p: 成功確率
+    :type p: float
+    :return: 累積確率（添字が k）
+    :rtype: List[float]
+    """
+    if p <= 0.0:
+        return [1.0] * (n + 1)
+    if p >= 1.0:
+        return [0.0] * n + [1.0]
+
+    log_p = math.log(p)
+    log_q = math.log1p(-p)
+    log_n = math.lgamma(n + 1)
+    cdfs = []
+    total = 0.0
+    for i in range(n + 1):
+        total += math.exp(log_n - math.lgamma(i + 1) - math.lgamma(n - i + 1) + i * log_p + (n - i) * log_q)
+        cdfs.append(min(total, 1.0))
+    return cdfs
+
+
+def percentile_bounds(values: Sequence[float], q: float, confidence: float = 0.9) -> tuple[float, float]:
+    """パーセンタイルの片側信頼限界（下限, 上限）を順序統計量から求める
+
+    分布を仮定しない方法。x_(k) が真のパーセンタイル以下である確率は P(Binomial(n, q) >= k) なので、
+    それが confidence 以上となる最大の k を下限、同様に最小の k を上限とする。
+    サンプルが少なく限界が決まらない場合は、それぞれ -inf/inf を返す（最小値/最大値で代用すると
+    実際より狭い区間になり、少ないサンプルでも予算違反と判定してしまうため）
+
+    :param values: 測定値
+    :type values: Sequence[float]
+    :param q: パーセンタイル（0..100）
+    :type q: float
+    :param confidence: 片側信頼度（0..1）
+    :type confidence: float
+    :return: (下限, 上限)
+    :rtype: tuple[float, float]
+    """
+    if not values:
+        return math.nan, math.nan
+
+    xs = sorted(values)
+    n = len(xs)
+    p = q / 100.0
+
+    cdfs = _binom_cdfs(n, p)
+
+    #下限：P(X >= k) >= confidence を満たす最大の k（1始まり）
+    lo = -math.inf
+    for k in range(n, 0, -1):
+        if 1.0 - cdfs[k - 1] >= confidence:
+            lo = xs[k - 1]
+            break
+
+    #上限：P(X <= k-1) >= confidence を満たす最小の k（1始まり）
+    hi = math.inf
+    for k in range(1, n + 1):
+        if cdfs[k - 1] >= confidence:
+            hi = xs[k - 1]
+            break
+
+    return lo, hi
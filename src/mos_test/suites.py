@@ -4,6 +4,11 @@ from __future__ import annotations
 
 def load_smoke_cases():
     """テストケース
+
+    各ケースは id/name/request/expect を持つ。応答時間も検証したいケースには slo を付ける：
+        - repeat: 計測する実行回数（デフォルト 1）
+        - warmup: 計測前に捨てる実行回数（デフォルト 0）
+        - max_pNN_ms: NNパーセンタイルの予算（ms）。例：max_p95_ms
     """
     return [
         {
@@ -17,6 +22,7 @@ def load_smoke_cases():
                 "billStatus": None,
             }],
             "expect": {"is_error": False},
+            "slo": {"repeat": 20, "warmup": 2, "max_p50_ms": 500, "max_p95_ms": 2000},
         },
         {
             "id": "S02",
@@ -51,6 +57,7 @@ def load_smoke_cases():
                 "billStatus": 1
             },
             "expect": {"is_error": True, "errorCode": "ORDER_NOT_FOUND"},
+            "slo": {"repeat": 10, "warmup": 1, "max_p95_ms": 500},
         },
         {
             "id": "S05",
@@ -165,6 +172,7 @@ def load_smoke_cases():
                 "billStatus": 15,
             }],
             "expect": {"is_error": False},
+            "slo": {"repeat": 20, "warmup": 2, "max_p95_ms": 2000},
         },
         {
             "id": "S15",
@@ -2,7 +2,7 @@
 """
 from __future__ import annotations
 import re
-from typing import Optional, Any, List
+from typing import Optional, Any, Dict, List, Tuple
 
 from mos_test.models import Order, ErrorResponse
 
@@ -16,6 +16,9 @@ RE_MENUID = re.compile(r"^[FD][0-9]{3}$")
 ALLOWED_STATUS_SINGLE = {1, 2, 4, 8}            # レスポンスのbillStatusは単一値（1/2/4/8）
 ALLOWED_STATUS_MASK_RANGE = set(range(1, 16))   # リクエストのbillStatusはビットマスク（1..15）
 
+#検証ロジック（_check_order_format）を変えたら上げる。検証結果キャッシュの無効化に使う
+RULES_VERSION = 1
+
 
 def validate_error_response(obj: Any) -> None:
     """エラーレスポンスがErrorResponse形式であることを保証する
@@ -26,6 +29,39 @@ def validate_error_response(obj: Any) -> None:
     ErrorResponse.model_validate(obj)
 
 
+def _check_order_format(o: Order) -> None:
+    """1注文のスキーマ/フォーマットをチェックする
+
+    :param o: 注文
+    :type o: Order
+    """
+    if not RE_STORE.match(o.storeNo):
+        raise AssertionError(f"Invalid storeNo format: {o.storeNo}")
+    if not RE_CUSTOMER.match(o.customerId):
+        raise AssertionError(f"Invalid customerId format: {o.customerId}")
+    if not RE_HASH.match(o.hash):
+        raise AssertionError(f"Invalid hash format: {o.hash}")
+    if not RE_TIME.match(o.entryTime):
+        raise AssertionError(f"Invalid entryTime format: {o.entryTime}")
+    if o.billStatus not in ALLOWED_STATUS_SINGLE:
+        raise AssertionError(f"Invalid billStatus (must be one of {sorted(ALLOWED_STATUS_SINGLE)}): {o.billStatus}")
+
+    #storeNoとcustomerIdの一貫性
+    if o.customerId[:2] != o.storeNo:
+        raise AssertionError(f"storeNo and customerId prefix mismatch: storeNo={o.storeNo} customerId={o.customerId}")
+
+    #itemsの検証
+    for it in o.items:
+        if not RE_TIME.match(it.orderTime):
+            raise AssertionError(f"Invalid orderTime format: {it.orderTime}")
+        if not RE_MENUID.match(it.menuId):
+            raise AssertionError(f"Invalid menuId format: {it.menuId}")
+        if it.orderQty < 1:
+            raise AssertionError("orderQty must be >= 1")
+        if it.offerQty < 0:
+            raise AssertionError("offerQty must be >= 0")
+
+
 def validate_orders_response(
     obj: Any,
     expected_customer_id: Optional[str] = None,
@@ -58,51 +94,140 @@ def validate_orders_response(
 
     #スキーマ/フォーマットのチェック
     for o in orders:
-        if not RE_STORE.match(o.storeNo):
-            raise AssertionError(f"Invalid storeNo format: {o.storeNo}")
-        if not RE_CUSTOMER.match(o.customerId):
-            raise AssertionError(f"Invalid customerId format: {o.customerId}")
-        if not RE_HASH.match(o.hash):
-            raise AssertionError(f"Invalid hash format: {o.hash}")
-        if not RE_TIME.match(o.entryTime):
-            raise AssertionError(f"Invalid entryTime format: {o.entryTime}")
-        if o.billStatus not in ALLOWED_STATUS_SINGLE:
-            raise AssertionError(f"Invalid billStatus (must be one of {sorted(ALLOWED_STATUS_SINGLE)}): {o.billStatus}")
-
-        #storeNoとcustomerIdの一貫性
-        if o.customerId[:2] != o.storeNo:
-            raise AssertionError(f"storeNo and customerId prefix mismatch: storeNo={o.storeNo} customerId={o.customerId}")
-
-        #itemsの検証
-        for it in o.items:
-            if not RE_TIME.match(it.orderTime):
-                raise AssertionError(f"Invalid orderTime format: {it.orderTime}")
-            if not RE_MENUID.match(it.menuId):
-                raise AssertionError(f"Invalid menuId format: {it.menuId}")
-            if it.orderQty < 1:
-                raise AssertionError("orderQty must be >= 1")
-            if it.offerQty < 0:
-                raise AssertionError("offerQty must be >= 0")
+        _check_order_format(o)
+
+    check_conditions(
+        orders,
+        expected_customer_id=expected_customer_id,
+        expected_bill_status_mask=expected_bill_status_mask,
+        from_time=from_time,
+        to_time=to_time,
+    )
+
+    return orders
+
+
+def check_conditions(
+    orders: List[Order],
+    expected_customer_id: Optional[str] = None,
+    expected_bill_status_mask: Optional[int] = None,
+    from_time: Optional[str] = None,
+    to_time: Optional[str] = None,
+) -> None:
+    """フォーマット検証済みの注文配列について、リクエスト条件との整合を検証する
+
+    :param orders: フォーマット検証済みの注文
+    :type orders: List[Order]
+    :param expected_customer_id: CLIでcustomerIdを指定した場合に渡す
+    :type expected_customer_id: Optional[str]
+    :param expected_bill_status_mask: --bill-flagを複数指定した場合に渡す
+    :type expected_bill_status_mask: Optional[int]
+    :param from_time: 範囲チェック
+    :type from_time: Optional[str]
+    :param to_time: 範囲チェック
+    :type to_time: Optional[str]
+    """
+    _check_conditions(
+        [(o.customerId, o.billStatus, o.entryTime) for o in orders],
+        expected_customer_id,
+        expected_bill_status_mask,
+        from_time,
+        to_time,
+    )
+
+
+def check_conditions_json(
+    objs: List[Dict[str, Any]],
+    expected_customer_id: Optional[str] = None,
+    expected_bill_status_mask: Optional[int] = None,
+    from_time: Optional[str] = None,
+    to_time: Optional[str] = None,
+) -> None:
+    """check_conditions() と同じ検証を、モデル化せずに注文JSON（dict）のまま行う
+
+    フォーマット検証済みの注文にだけ使う。billStatus は Order と同じく int に揃えてから比較する
+
+    :param objs: フォーマット検証済みの注文JSON
+    :type objs: List[Dict[str, Any]]
+    :param expected_customer_id: CLIでcustomerIdを指定した場合に渡す
+    :type expected_customer_id: Optional[str]
+    :param expected_bill_status_mask: --bill-flagを複数指定した場合に渡す
+    :type expected_bill_status_mask: Optional[int]
+    :param from_time: 範囲チェック
+    :type from_time: Optional[str]
+    :param to_time: 範囲チェック
+    :type to_time: Optional[str]
+    """
+    _check_conditions(
+        [(o["customerId"], int(o["billStatus"]), o["entryTime"]) for o in objs],
+        expected_customer_id,
+        expected_bill_status_mask,
+        from_time,
+        to_time,
+    )
+
+
+def _check_conditions(
+    rows: List[Tuple[str, int, str]],
+    expected_customer_id: Optional[str],
+    expected_bill_status_mask: Optional[int],
+    from_time: Optional[str],
+    to_time: Optional[str],
+) -> None:
+    """(customerId, billStatus, entryTime) の配列について条件を検証する
+    """
 
     #customerId指定の検証
     if expected_customer_id is not None:
-        if len(orders) > 1:
+        if len(rows) > 1:
             raise AssertionError("customerId specified, but multiple orders returned.")
-        if len(orders) == 1 and orders[0].customerId != expected_customer_id:
-            raise AssertionError(f"customerId mismatch expected={expected_customer_id} actual={orders[0].customerId}")
+        if len(rows) == 1 and rows[0][0] != expected_customer_id:
+            raise AssertionError(f"customerId mismatch expected={expected_customer_id} actual={rows[0][0]}")
 
     #billStatus mask の検証
     if expected_bill_status_mask is not None:
         if expected_bill_status_mask not in ALLOWED_STATUS_MASK_RANGE:
             raise AssertionError(f"Invalid expected mask (must be 1..15): {expected_bill_status_mask}")
-        for o in orders:
-            if (o.billStatus & expected_bill_status_mask) == 0:
-                raise AssertionError(f"billStatus {o.billStatus} does not match mask {expected_bill_status_mask}")
+        for _, bill_status, _ in rows:
+            if (bill_status & expected_bill_status_mask) == 0:
+                raise AssertionError(f"billStatus {bill_status} does not match mask {expected_bill_status_mask}")
 
     #from/to チェックは文字列ベース
     if from_time and to_time:
-        for o in orders:
-            if not (from_time <= o.entryTime <= to_time):
-                raise AssertionError(f"entryTime out of range: {o.entryTime}")
+        for _, _, entry_time in rows:
+            if not (from_time <= entry_time <= to_time):
+                raise AssertionError(f"entryTime out of range: {entry_time}")
 
-    return orders
+
+def validate_order(
+    obj: Any,
+    expected_bill_status_mask: Optional[int] = None,
+    from_time: Optional[str] = None,
+    to_time: Optional[str] = None,
+) -> Order:
+    """注文1件について、validate_orders_response() と同じスキーマ/フォーマット/条件を検証する
+
+    注文配列全体ではなく、差分（新規・変化した注文）だけを検証したい場合に使う。
+    customerId の件数チェックは配列全体に対する条件なので含めない
+
+    :param obj: 注文1件のJSON
+    :type obj: Any
+    :param expected_bill_status_mask: --bill-flagを複数指定した場合に渡す
+    :type expected_bill_status_mask: Optional[int]
+    :param from_time: 範囲チェック
+    :type from_time: Optional[str]
+    :param to_time: 範囲チェック
+    :type to_time: Optional[str]
+    :return: 検証済みOrder
+    :rtype: Order
+    """
+    o = Order.model_validate(obj)
+    _check_order_format(o)
+
+    if expected_bill_status_mask is not None and (o.billStatus & expected_bill_status_mask) == 0:
+        raise AssertionError(f"billStatus {o.billStatus} does not match mask {expected_bill_status_mask}")
+
+    if from_time and to_time and not (from_time <= o.entryTime <= to_time):
+        raise AssertionError(f"entryTime out of range: {o.entryTime}")
+
+    return o
@@ -0,0 +1,166 @@
+"""getOrders を定期的にポーリングし、変化した注文だけを検証する
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from mos_test.hash_rules import compute_order_hash_v1
+from mos_test.validators import validate_order
+
+#"5s" / "500ms" / "2m" / "6h" / "10"（秒）
+RE_DURATION = re.compile(r"^(\d+(?:\.\d+)?)(ms|s|m|h)?$")
+_UNIT_SEC = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0, None: 1.0}
+
+
+def parse_duration(text: str) -> float:
+    """期間の文字列を秒に変換する
+
+    :param text: "5s" / "500ms" / "2m" / "6h" など（単位省略時は秒）
+    :type text: str
+    :return: 秒
+    :rtype: float
+    """
+    m = RE_DURATION.match(text.strip())
+    if not m:
+        raise ValueError(f"Invalid duration: {text}")
+    return float(m.group(1)) * _UNIT_SEC[m.group(2)]
+
+
+def _identity(o: Any) -> Optional[Tuple[str, str, str]]:
+    """注文の同一性を表すキー（storeNo, customerId, entryTime）。作れなければ None
+    """
+    if not isinstance(o, dict):
+        return None
+    key = (o.get("storeNo"), o.get("customerId"), o.get("entryTime"))
+    return key if all(isinstance(x, str) for x in key) else None
+
+
+@dataclass
+class _Entry:
+    """検証済み注文の記録
+    """
+    hash: Any           #明細が増えると変わる
+    bill_status: Any
+    ok: bool
+    error: Optional[str] = None
+
+
+@dataclass
+class PollResult:
+    """1回のポーリングでの差分と検証結果
+    """
+    total: int = 0          #今回返ってきた注文数
+    new: int = 0            #初めて見た注文
+    changed: int = 0        #billStatus または hash（明細の追加など）が変わった注文
+    evicted: int = 0        #ウィンドウから外れて（または billStatus の条件から外れて）索引から消した注文
+    failures: List[Dict[str, Any]] = field(default_factory=list)   #今回新たに見つかった不正
+
+
+class WatchIndex:
+    """検証済み注文の索引（(storeNo, customerId, entryTime) をキーにする）
+
+    hash は明細を含むので、会計前の注文に明細が追加されると変わる。そのため注文の同一性は
+    来店を表すキーで追跡し、hash や billStatus が変わった注文は「変化」として再検証する。
+    スキーマ/フォーマット/hash の検証は、新規または変化した注文にだけ行う
+    """
+
+    def __init__(self, expected_bill_status_mask: Optional[int] = None):
+        """空の索引を作る
+
+        :param self: 索引
+        :param expected_bill_status_mask: --bill-flagを複数指定した場合に渡す
+        :type expected_bill_status_mask: Optional[int]
+        """
+        self.expected_bill_status_mask = expected_bill_status_mask
+        self._entries: Dict[Tuple[str, str, str], _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def invalid(self) -> int:
+        """索引中の不正な注文の数
+        """
+        return sum(1 for e in self._entries.values() if not e.ok)
+
+    def _verify(self, o: Any, from_time: Optional[str], to_time: Optional[str]) -> Optional[str]:
+        """注文1件を検証し、不正なら理由を返す
+        """
+        try:
+            validate_order(
+                o,
+                expected_bill_status_mask=self.expected_bill_status_mask,
+                from_time=from_time,
+                to_time=to_time,
+            )
+        except Exception as e:
+            return str(e).splitlines()[0]
+
+        expected = compute_order_hash_v1(o)
+        if o.get("hash") != expected:
+            return f"hash mismatch actual={o.get('hash')} expected={expected}"
+        return None
+
+    def update(self, orders: List[Any], from_time: Optional[str] = None, to_time: Optional[str] = None) -> PollResult:
+        """ポーリング結果を索引に反映する
+
+        今回の応答に含まれない注文は索引から消す。entryTime がウィンドウの開始より前なら正常な退出、
+        まだウィンドウ内なのに消えた注文は不正として報告する（billStatus で絞り込んでいる場合は、
+        billStatus の変化で条件から外れることがあるので不正とはしない）
+
+        :param self: 索引
+        :param orders: getOrders の返却JSON（注文配列）
+        :type orders: List[Any]
+        :param from_time: 今回のウィンドウの開始日時
+        :type from_time: Optional[str]
+        :param to_time: 今回のウィンドウの終了日時
+        :type to_time: Optional[str]
+        :return: 差分と検証結果
+        :rtype: PollResult
+        """
+        result = PollResult(total=len(orders))
+        entries: Dict[Tuple[str, str, str], _Entry] = {}
+
+        for o in orders:
+            key = _identity(o)
+            prev = self._entries.get(key) if key is not None else None
+            h = o.get("hash") if isinstance(o, dict) else None
+
+            #検証済みで hash も billStatus も変わっていなければそのまま引き継ぐ
+            if prev is not None and prev.hash == h and prev.bill_status == o.get("billStatus"):
+                entries[key] = prev
+                continue
+
+            if prev is None:
+                result.new += 1
+            else:
+                result.changed += 1
+
+            error = self._verify(o, from_time, to_time)
+            if error:
+                result.failures.append({
+                    "storeNo": o.get("storeNo") if isinstance(o, dict) else None,
+                    "customerId": o.get("customerId") if isinstance(o, dict) else None,
+                    "hash": h,
+                    "error": error,
+                })
+            if key is not None:
+                entries[key] = _Entry(hash=h, bill_status=o.get("billStatus"), ok=error is None, error=error)
+
+        for key, prev in self._entries.items():
+            if key in entries:
+                continue
+            store_no, customer_id, entry_time = key
+            if (from_time is not None and entry_time < from_time) or self.expected_bill_status_mask is not None:
+                result.evicted += 1
+            else:
+                result.failures.append({
+                    "storeNo": store_no,
+                    "customerId": customer_id,
+                    "entryTime": entry_time,
+                    "hash": prev.hash,
+                    "error": "order disappeared while still in window",
+                })
+        self._entries = entries
+        return result
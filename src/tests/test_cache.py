@@ -0,0 +1,107 @@
+"""検証結果キャッシュが、変化のない注文の再検証を省けているかを確認するテスト
+"""
+import pytest
+from mos_test import cache as cache_module
+from mos_test import validators
+from mos_test.cache import VerifiedCache, validate_orders_cached
+from mos_test.generator import WorkloadConfig, generate_orders
+
+
+def _orders(count: int) -> list:
+    """hash付きの正しい注文を count 件作る
+    """
+    return list(generate_orders(WorkloadConfig(seed=1), count))
+
+
+def test_cache_hits_across_runs(tmp_path):
+    """2回目の実行ではキャッシュから結果を返すことを確認する
+    """
+    path = str(tmp_path / "cache.db")
+    orders = _orders(10)
+
+    with VerifiedCache(path) as cache:
+        assert validate_orders_cached(orders, cache) == []
+        assert (cache.hits, cache.misses) == (0, 10)
+
+    with VerifiedCache(path) as cache:
+        assert validate_orders_cached(orders, cache) == []
+        assert (cache.hits, cache.misses) == (10, 0)
+
+
+def test_cache_detects_mismatch_and_format_error(tmp_path):
+    """hash不一致とフォーマット不正がキャッシュ越しでも検出されることを確認する
+    """
+    path = str(tmp_path / "cache.db")
+    a, b = _orders(2)
+    tampered = dict(a, entryTime="2025-11-24T23:59:59")
+    bad_format = dict(b, customerId="A0002")
+
+    for _ in range(2):
+        with VerifiedCache(path) as cache:
+            assert len(validate_orders_cached([tampered], cache)) == 1
+            with pytest.raises(AssertionError):
+                validate_orders_cached([bad_format], cache)
+
+
+def test_cache_lru_eviction(tmp_path):
+    """上限を超えた場合、最終利用が古いものから消えることを確認する
+    """
+    with VerifiedCache(str(tmp_path / "cache.db"), max_entries=3) as cache:
+        a, b, c, d = _orders(4)
+        cache.verify([a, b, c])
+        cache.verify([a])       #a を最近使ったことにする
+        cache.verify([d])       #b が追い出される
+        assert len(cache) == 3 and cache.evicted == 1
+
+        cache.hits = cache.misses = 0
+        cache.verify([a, b])
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_invalidated_on_rule_change(tmp_path, monkeypatch):
+    """検証ルールの版数が変わるとキャッシュが捨てられることを確認する
+    """
+    path = str(tmp_path / "cache.db")
+    with VerifiedCache(path) as cache:
+        cache.verify(_orders(1))
+
+    monkeypatch.setattr(validators, "RULES_VERSION", validators.RULES_VERSION + 1)
+    with VerifiedCache(path) as cache:
+        assert len(cache) == 0
+
+
+def test_cache_coerces_bill_status(tmp_path):
+    """文字列の billStatus もモデル検証と同じく数値として条件チェックすることを確認する
+    """
+    order = dict(_orders(1)[0], billStatus="4")
+    with VerifiedCache(str(tmp_path / "cache.db")) as cache:
+        for _ in range(2):
+            assert validate_orders_cached([order], cache, expected_bill_status_mask=4) == []
+            with pytest.raises(AssertionError):
+                validate_orders_cached([order], cache, expected_bill_status_mask=1)
+
+
+def test_warm_cache_skips_verification(tmp_path, monkeypatch):
+    """キャッシュ済みの注文にはフォーマット検証もhash再計算も行わないことを確認する
+    """
+    calls = {"validate_order": 0, "compute_order_hash_v1": 0}
+
+    def counted(name, f):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return f(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(cache_module, "validate_order", counted("validate_order", cache_module.validate_order))
+    monkeypatch.setattr(
+        cache_module, "compute_order_hash_v1", counted("compute_order_hash_v1", cache_module.compute_order_hash_v1)
+    )
+
+    orders = _orders(50)
+    with VerifiedCache(str(tmp_path / "cache.db")) as cache:
+        validate_orders_cached(orders, cache)
+        assert calls == {"validate_order": 50, "compute_order_hash_v1": 50}
+
+        validate_orders_cached(orders, cache, from_time="2025-11-24T00:00:00", to_time="2025-12-31T23:59:59")
+        assert calls == {"validate_order": 50, "compute_order_hash_v1": 50}
+        assert cache.hits == 50
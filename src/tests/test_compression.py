@@ -0,0 +1,129 @@
+"""圧縮レスポンスをストリームで展開し、転送サイズを正しく記録できるかを検証するテスト
+"""
+import gzip
+import json
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from mos_test.client import MosClient, accept_encoding, make_decoder
+
+
+BODY = json.dumps([{"storeNo": "AA", "customerId": "AA0001"}] * 100).encode("utf-8")
+
+
+def _raw_deflate(data: bytes) -> bytes:
+    """zlib ヘッダなしの deflate（一部のサーバが deflate として返す形式）
+    """
+    c = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return c.compress(data) + c.flush()
+
+
+@pytest.mark.parametrize("encoding,compressed", [
+    ("identity", BODY),
+    ("gzip", gzip.compress(BODY)),
+    ("deflate", zlib.compress(BODY)),
+    ("deflate", _raw_deflate(BODY)),
+])
+def test_stream_decode(encoding, compressed):
+    """小さいチャンクに分けて渡しても元のボディに戻ることを確認する
+
+    :param encoding: Content-Encoding
+    :type encoding: str
+    :param compressed: 圧縮済みのボディ
+    :type compressed: bytes
+    """
+
+    decoder = make_decoder(encoding)
+    out = bytearray()
+    for i in range(0, len(compressed), 7):
+        out += decoder.decompress(compressed[i:i + 7])
+    out += decoder.flush()
+    assert bytes(out) == BODY
+
+
+def test_unsupported_encoding():
+    """対応していないコーデックはValueErrorになることを確認する
+    """
+    with pytest.raises(ValueError):
+        make_decoder("compress")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/<mode>/api/orders で応答を切り替えるスタブ（mode: ok / slow / truncated）
+    """
+    seen_accept_encoding = []
+    release = threading.Event()     #slow の応答を止めておくためのイベント（終了時にセット）
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        _Handler.seen_accept_encoding.append(self.headers.get("Accept-Encoding"))
+        mode = self.path.split("/")[1]
+
+        data = BODY
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            data = gzip.compress(BODY)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+
+        if mode == "slow":
+            self.wfile.write(data[:10])
+            self.wfile.flush()
+            _Handler.release.wait(5.0)
+        elif mode == "truncated":
+            self.wfile.write(data[:len(data) // 2])
+        else:
+            self.wfile.write(data)
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    """スタブサーバを起動してURLを返す
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = False   #server_close() で応答スレッドの終了を待つ
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    #応答途中のスレッドを残すと他のテスト（プロファイラ）のサンプルに混ざるため、待たせている応答も終わらせる
+    _Handler.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_post_orders_accounting(stub_url, compress):
+    """Accept-Encoding と転送/展開後のバイト数の記録を確認する
+
+    :param compress: 圧縮転送を要求するか
+    :type compress: bool
+    """
+    resp = MosClient(f"{stub_url}/ok", compress=compress).post_orders([])
+
+    assert _Handler.seen_accept_encoding[-1] == (accept_encoding() if compress else "identity")
+    assert resp.raw_json == json.loads(BODY)
+    assert resp.body_bytes == len(BODY)
+    if compress:
+        assert resp.content_encoding == "gzip"
+        assert resp.wire_bytes == len(gzip.compress(BODY))
+        assert resp.wire_bytes < resp.body_bytes
+        assert 0 < resp.decompress_ms <= resp.elapsed_ms
+    else:
+        assert resp.wire_bytes == len(BODY)
+
+
+@pytest.mark.parametrize("mode", ["slow", "truncated"])
+def test_post_orders_read_errors_propagate(stub_url, mode):
+    """読み出し中のタイムアウト/途中切断は擬似エラーではなく requests の例外になることを確認する
+
+    :param mode: スタブの応答モード
+    :type mode: str
+    """
+    with pytest.raises(requests.RequestException):
+        MosClient(f"{stub_url}/{mode}", timeout_sec=0.3).post_orders([])
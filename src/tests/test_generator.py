@@ -0,0 +1,98 @@
+"""生成した擬似注文が、検証ツールの仕様をすべて満たしているかを確認するテスト
+"""
+import io
+import json
+from datetime import datetime, timedelta
+from mos_test import generator
+from mos_test.generator import WorkloadConfig, generate_orders, parse_bill_mix, write_jsonl
+from mos_test.runner import find_hash_mismatches
+from mos_test.validators import validate_orders_response
+
+
+def test_generated_orders_are_valid():
+    """スキーマ/フォーマット/hash の検証を通ることを確認する
+    """
+    config = WorkloadConfig(stores=["AA", "AB"], seed=1)
+    orders = list(generate_orders(config, 2000))
+
+    validate_orders_response(orders)
+    assert find_hash_mismatches(orders) == []
+
+
+def test_distributions():
+    """billStatus の比率と customerId の再利用が設定どおりになることを確認する
+    """
+    config = WorkloadConfig(bill_mix={1: 1.0, 8: 1.0}, customer_reuse=0.5, customer_gap_hours=1.0, seed=2)
+    orders = list(generate_orders(config, 4000))
+
+    assert {o["billStatus"] for o in orders} == {1, 8}
+    assert 0.4 < sum(o["billStatus"] == 1 for o in orders) / len(orders) < 0.6
+    assert len({o["customerId"] for o in orders}) < 0.6 * len(orders)
+
+
+def test_entry_time_ordered_across_chunks(monkeypatch):
+    """チャンクの境目でも entryTime が戻らず、ワーカー数に関係なく同じ出力になることを確認する
+    """
+    monkeypatch.setattr(generator, "CHUNK_ORDERS", 100)
+    config = WorkloadConfig(stores=["AA", "AB"], seed=4)
+
+    times = [o["entryTime"] for o in generate_orders(config, 350)]
+    assert times == sorted(times)
+
+    outputs = []
+    for workers in (1, 2):
+        buf = io.BytesIO()
+        write_jsonl(config, 350, buf, workers=workers)
+        outputs.append(buf.getvalue())
+    assert outputs[0] == outputs[1]
+    assert [json.loads(x)["entryTime"] for x in outputs[0].decode("utf-8").splitlines()] == times
+
+
+def test_customer_gap(monkeypatch):
+    """同じ customerId の注文が customer_gap_hours 以内に2件入らないことを確認する
+    """
+    monkeypatch.setattr(generator, "CHUNK_ORDERS", 500)
+    config = WorkloadConfig(orders_per_hour=200.0, customer_reuse=0.9, customer_gap_hours=6.0, seed=5)
+    orders = list(generate_orders(config, 3000))
+
+    last: dict = {}
+    reused = 0
+    for o in orders:
+        entry = datetime.fromisoformat(o["entryTime"])
+        prev = last.get(o["customerId"])
+        if prev is not None:
+            reused += 1
+            assert entry - prev >= timedelta(hours=6)
+        last[o["customerId"]] = entry
+    assert reused > 0
+
+
+def test_write_jsonl_reproducible():
+    """シード指定時は同じ JSONL が出力されることを確認する
+    """
+    outputs = []
+    for _ in range(2):
+        buf = io.BytesIO()
+        assert write_jsonl(WorkloadConfig(seed=3), 100, buf) == 100
+        outputs.append(buf.getvalue())
+
+    assert outputs[0] == outputs[1]
+    lines = outputs[0].decode("utf-8").splitlines()
+    assert len(lines) == 100
+    validate_orders_response([json.loads(x) for x in lines])
+
+
+def test_parse_bill_mix():
+    """billStatus の重みの指定を読めることを確認する
+    """
+    assert parse_bill_mix("1:0.4,8:0.6") == {1: 0.4, 8: 0.6}
+
+
+def test_large_items_max():
+    """明細数の上限を大きくしても重みが桁あふれしないことを確認する
+    """
+    config = WorkloadConfig(items_mean=2.5, items_max=300, seed=6)
+    orders = list(generate_orders(config, 200))
+
+    validate_orders_response(orders)
+    assert max(len(o["items"]) for o in orders) <= 300
@@ -0,0 +1,54 @@
+"""プロファイラが時間をカテゴリに振り分け、collapsed 形式で書き出せるかを検証するテスト
+"""
+import sys
+import time
+from mos_test.client import _decompress
+from mos_test.hash_rules import compute_order_hash_v1
+from mos_test.profiler import DECOMPRESS_CATEGORY, SamplingProfiler, _category, idle_sleep
+
+
+def test_profile_hash(tmp_path):
+    """hash計算中のサンプルが compute_order_hash_v1 に集計されることを確認する
+    """
+    order = {"storeNo": "AA", "customerId": "AA0001", "entryTime": "2025-11-24T20:00:00", "items": []}
+
+    profiler = SamplingProfiler()
+    profiler.start()
+    deadline = time.perf_counter() + 0.2
+    while time.perf_counter() < deadline:
+        compute_order_hash_v1(order)
+    profiler.stop()
+
+    assert profiler.categories["compute_order_hash_v1"] > 0
+
+    path = tmp_path / "profile.folded"
+    profiler.write_collapsed(str(path))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines
+    stack, value = lines[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;") and int(value) > 0
+
+
+def test_decompress_category():
+    """レスポンスの展開が通信時間ではなく decompress に集計されることを確認する
+    """
+
+    class _Decoder:
+        def decompress(self, data):
+            self.caller = sys._getframe(1)
+            return data
+
+    decoder = _Decoder()
+    _decompress(decoder, b"{}")
+    assert _category(decoder.caller) == DECOMPRESS_CATEGORY
+
+
+def test_idle_sleep_not_counted():
+    """idle_sleep での待機はツール側の時間に数えないことを確認する
+    """
+    profiler = SamplingProfiler()
+    profiler.start()
+    idle_sleep(0.2)
+    profiler.stop()
+
+    assert profiler.tool_ms < 50.0
@@ -0,0 +1,154 @@
+"""接続先一覧の読み込み、レイテンシ集計/予算判定、スイート実行の集計を検証するテスト
+"""
+import math
+import pytest
+import requests
+from mos_test.client import MosResponse
+from mos_test.generator import WorkloadConfig, generate_orders
+from mos_test.runner import check_latency, check_slo, load_targets, run_case, run_smoke, run_targets
+from mos_test.stats import percentile, percentile_bounds
+
+
+def test_load_targets(tmp_path):
+    """URLのみ/ラベル付きの行、コメントと空行を正しく扱えることを確認する
+    """
+    path = tmp_path / "targets.txt"
+    path.write_text(
+        "# stores\n"
+        "AA http://10.0.0.11:8080\n"
+        "\n"
+        "http://10.0.0.12:8080  # label omitted\n",
+        encoding="utf-8",
+    )
+    assert load_targets(str(path)) == [
+        ("AA", "http://10.0.0.11:8080"),
+        ("http://10.0.0.12:8080", "http://10.0.0.12:8080"),
+    ]
+
+
+def test_percentile():
+    """線形補間のパーセンタイルを確認する
+    """
+    values = [10.0, 20.0, 30.0, 40.0, 50.0]
+    assert percentile(values, 0) == 10.0
+    assert percentile(values, 50) == 30.0
+    assert percentile(values, 95) == 48.0
+    assert percentile(values, 100) == 50.0
+
+
+def test_percentile_bounds():
+    """信頼区間が点推定を挟み、サンプルが少なく限界が決まらない場合は -inf/inf になることを確認する
+    """
+    values = [float(v) for v in range(1, 101)]
+    lo, hi = percentile_bounds(values, 95, 0.9)
+    assert lo <= percentile(values, 95) <= hi
+    assert percentile_bounds([1.0, 2.0, 3.0], 95, 0.9)[1] == math.inf
+    assert percentile_bounds([600.0, 700.0], 5, 0.9)[0] == -math.inf
+
+
+def test_percentile_bounds_large_n():
+    """p99 の判定に必要な数千サンプルでも溢れずに区間を求められることを確認する
+    """
+    values = [float(v) for v in range(1, 5001)]
+    lo, hi = percentile_bounds(values, 99, 0.9)
+    assert 4900 < lo <= percentile(values, 99) <= hi < 5000
+
+
+def test_check_latency():
+    """信頼区間の下限が予算を超えた場合のみ違反になることを確認する
+    """
+    fast = [100.0] * 19 + [900.0]
+    lines, violations = check_latency(fast, {"repeat": 20, "max_p95_ms": 500}, 0.9)
+    assert len(lines) == 1
+    assert not violations
+
+    slow = [600.0] * 20
+    _, violations = check_latency(slow, {"max_p95_ms": 500}, 0.9)
+    assert violations
+
+    #下限が決まらないほどサンプルが少ない場合は違反にしない
+    _, violations = check_latency([600.0, 700.0], {"max_p5_ms": 500}, 0.9)
+    assert not violations
+
+
+@pytest.mark.parametrize("slo", [
+    {"repeat": 20, "max_p95ms": 500},
+    {"repeat": 0, "max_p95_ms": 500},
+    {"warmup": -1},
+    {"max_p120_ms": 500},
+])
+def test_check_slo_rejects_invalid(slo):
+    """予算キーの書き間違いや repeat < 1 を黙って通さないことを確認する
+
+    :param slo: 不正な slo
+    :type slo: dict
+    """
+    with pytest.raises(ValueError):
+        check_slo(slo)
+
+
+class _FakeClient:
+    """決まった応答（または例外）を順に返すクライアント
+    """
+
+    def __init__(self, url, replies):
+        self.base_url = url
+        self.replies = list(replies)
+
+    def post_orders(self, payload):
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return MosResponse(status_code=200, raw_json=reply, elapsed_ms=1.0)
+
+    def close(self):
+        pass
+
+
+_OK_CASE = {"id": "S01", "name": "ok", "request": {}, "expect": {"is_error": False}}
+
+
+def test_run_case_hash_mismatch():
+    """正常系のレスポンスでhashを再計算し、不一致を数えることを確認する
+    """
+    orders = list(generate_orders(WorkloadConfig(seed=1), 3))
+    result, _ = run_case(_FakeClient("x", [orders]), _OK_CASE)
+    assert result.ok and result.hash_mismatches == 0
+
+    orders[1] = dict(orders[1], hash="0" * 64)
+    result, _ = run_case(_FakeClient("x", [orders]), _OK_CASE)
+    assert not result.ok
+    assert result.hash_mismatches == 1
+
+
+def test_run_targets_keeps_results_on_request_error():
+    """スイート途中の通信失敗はそのケースの失敗として記録し、前後のケース結果を残すことを確認する
+    """
+    cases = [dict(_OK_CASE, id=f"S0{i}") for i in range(1, 4)]
+    replies = [[], requests.ConnectionError("connection reset"), []]
+    results = run_targets(
+        [("AA", "http://aa")],
+        lambda c: run_smoke(c, cases),
+        concurrency=1,
+        make_client=lambda url: _FakeClient(url, replies),
+    )
+    r = results[0]
+    assert r.error is None
+    assert [c.ok for c in r.cases] == [True, False, True]
+    assert "ConnectionError" in r.cases[1].error
+
+    #レスポンスの無かったケースは応答時間に含めない
+    assert r.cases[1].elapsed_ms is None
+    assert r.latency_percentile(0) == 1.0
+
+
+def test_latency_percentile_without_responses():
+    """全ケースが通信失敗した接続先は応答時間のサンプルが無い（nan）ことを確認する
+    """
+    results = run_targets(
+        [("AA", "http://aa")],
+        lambda c: run_smoke(c, [_OK_CASE]),
+        concurrency=1,
+        make_client=lambda url: _FakeClient(url, [requests.ConnectionError("refused")]),
+    )
+    assert math.isnan(results[0].latency_percentile(50))
@@ -3,7 +3,7 @@
 import os
 import pytest
 from mos_test.client import MosClient
-from mos_test.validators import validate_orders_response, validate_error_response
+from mos_test.runner import run_case
 from mos_test.suites import load_smoke_cases
 
 
@@ -20,16 +20,8 @@ def test_smoke(case):
     #テスト用の HTTP クライアントを生成
     client = MosClient(BASE_URL)
 
-    #POST /api/orders に投げる
-    resp = client.post_orders(case["request"])
+    #POST /api/orders に投げる（slo があれば繰り返し実行して応答時間も判定する）
+    result, _ = run_case(client, case)
 
-    #期待値の取り出し
-    exp = case["expect"]
-
-    #エラーケースの検証
-    if exp.get("is_error"):
-        validate_error_response(resp.raw_json)
-        assert resp.raw_json["errorCode"] == exp["errorCode"]
-    #正常ケースの検証
-    else:
-        validate_orders_response(resp.raw_json)
+    #正常/エラーの期待値とレイテンシ予算の検証
+    assert result.ok, result.error
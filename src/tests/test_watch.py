@@ -0,0 +1,104 @@
+"""watch の索引が、変化した注文だけを検証しているかを確認するテスト
+"""
+from mos_test.hash_rules import compute_order_hash_v1
+from mos_test.watch import WatchIndex, parse_duration
+
+
+def _order(customer_id: str, bill_status: int = 1, entry_time: str = "2025-11-24T20:00:00") -> dict:
+    """hash付きの正しい注文を作る
+    """
+    o = {
+        "storeNo": "AA",
+        "customerId": customer_id,
+        "entryTime": entry_time,
+        "billStatus": bill_status,
+        "items": [{
+            "orderTime": "2025-11-24T20:01:00",
+            "menuId": "F001",
+            "unitPrice": 500,
+            "taxRate": 10,
+            "orderQty": 1,
+            "offerQty": 0,
+        }],
+    }
+    o["hash"] = compute_order_hash_v1(o)
+    return o
+
+
+def test_index_tracks_changes():
+    """新規/billStatus変化/ウィンドウ外への移動を区別できることを確認する
+    """
+    index = WatchIndex()
+    a = _order("AA0001", entry_time="2025-11-24T19:30:00")
+    b = _order("AA0002", entry_time="2025-11-24T20:00:00")
+    c = _order("AA0003", entry_time="2025-11-24T20:30:00")
+
+    r = index.update([a, b], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+    assert (r.new, r.changed, r.evicted, r.failures) == (2, 0, 0, [])
+
+    #変化なし
+    r = index.update([a, b], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+    assert (r.new, r.changed, r.evicted) == (0, 0, 0)
+
+    #b の billStatus が変わり、a がウィンドウから外れ、c が増えた
+    b_paid = dict(b, billStatus=4)
+    r = index.update([b_paid, c], "2025-11-24T19:45:00", "2025-11-24T21:45:00")
+    assert (r.new, r.changed, r.evicted, r.failures) == (1, 1, 1, [])
+    assert len(index) == 2
+
+
+def test_index_tracks_added_items():
+    """明細が追加されて hash が変わった注文は、消えた注文ではなく変化として再検証することを確認する
+    """
+    index = WatchIndex()
+    a = _order("AA0001")
+    index.update([a], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+
+    a2 = dict(a, items=a["items"] + [dict(a["items"][0], orderTime="2025-11-24T20:05:00")])
+    a2.pop("hash")
+    a2["hash"] = compute_order_hash_v1(a2)
+    r = index.update([a2], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+    assert (r.new, r.changed, r.evicted, r.failures) == (0, 1, 0, [])
+    assert len(index) == 1
+
+    #hash が不正に変わった場合は再検証で検出する
+    r = index.update([dict(a2, hash="0" * 64)], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+    assert r.changed == 1 and len(r.failures) == 1
+
+
+def test_index_reports_disappeared_order():
+    """ウィンドウ内なのに応答から消えた注文は退出ではなく不正として報告することを確認する
+    """
+    index = WatchIndex()
+    a, b = _order("AA0001"), _order("AA0002")
+    index.update([a, b], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+
+    r = index.update([b], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+    assert r.evicted == 0
+    assert [f["hash"] for f in r.failures] == [a["hash"]]
+
+    #billStatus で絞り込んでいる場合は、条件から外れただけの可能性があるので退出扱い
+    index = WatchIndex(expected_bill_status_mask=1)
+    index.update([a, b], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+    r = index.update([b], "2025-11-24T19:00:00", "2025-11-24T21:00:00")
+    assert (r.evicted, r.failures) == (1, [])
+
+
+def test_index_reports_hash_mismatch_once():
+    """不正な注文は初回のみ報告されることを確認する
+    """
+    index = WatchIndex()
+    bad = dict(_order("AA0001"), entryTime="2025-11-24T20:30:00")
+
+    assert len(index.update([bad]).failures) == 1
+    assert index.update([bad]).failures == []
+    assert index.invalid == 1
+
+
+def test_parse_duration():
+    """期間文字列を秒に変換できることを確認する
+    """
+    assert parse_duration("5s") == 5.0
+    assert parse_duration("500ms") == 0.5
+    assert parse_duration("2m") == 120.0
+    assert parse_duration("10") == 10.0